@@ -1,13 +1,101 @@
+from datetime import datetime
+from typing import Optional
+import jwt
+from fastapi_users import exceptions
 from fastapi_users.authentication import AuthenticationBackend, BearerTransport, JWTStrategy
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
 from config.config import SECRET
+from config.database import async_session_maker
+from models import User, Branch
+from models.user import user_branches
+from .token_version import TokenVersions
+from .user_cache import detached
+
+JWT_LIFETIME = 21600
+# Отдельная аудитория: обычный JWTStrategy не принимает токены с claims и наоборот
+CLAIMS_AUDIENCE = ["kaimono:claims"]
 
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET, lifetime_seconds=21600)
+    return JWTStrategy(secret=SECRET, lifetime_seconds=JWT_LIFETIME)
 
 auth_backend = AuthenticationBackend(
     name="jwt",
     transport=bearer_transport,
     get_strategy=get_jwt_strategy,
-)
\ No newline at end of file
+)
+
+
+class ClaimsJWTStrategy(JWTStrategy):
+    """
+    JWT с правами пользователя в подписанных claims: is_active, is_superuser,
+    is_verified, филиалы и версия токенов (ver).
+
+    Пользователь восстанавливается из токена без обращения к БД. У филиалов
+    известен только id: этого достаточно для проверки прав и фильтрации по филиалам.
+    Токен отзывается, когда версия пользователя в TokenVersions отличается от ver
+    (пользователь изменён, удалён или деактивирован).
+    """
+
+    async def write_token(self, user: User) -> str:
+        # При входе пользователь загружен без филиалов, а ленивая загрузка в async-сессии недоступна
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(user_branches.c.branch_id).where(user_branches.c.user_id == user.id)
+            )
+            branch_ids = sorted(result.scalars().all())
+
+        data = {
+            "sub": str(user.id),
+            "aud": self.token_audience,
+            "ver": user.token_version or 0,
+            "email": user.email,
+            "name": user.name,
+            "lastname": user.lastname,
+            "register_at": user.register_at.isoformat() if user.register_at else None,
+            "is_active": user.is_active,
+            "is_superuser": user.is_superuser,
+            "is_verified": user.is_verified,
+            "branch_ids": branch_ids,
+        }
+        return generate_jwt(data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm)
+
+    async def read_token(self, token: Optional[str], user_manager) -> Optional[User]:
+        if token is None:
+            return None
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            user_id = user_manager.parse_id(data["sub"])
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID):
+            return None
+
+        if data.get("ver") != await TokenVersions.get(user_id):
+            return None
+
+        register_at = data.get("register_at")
+        user = detached(User, {
+            "id": user_id,
+            "token_version": data["ver"],
+            "email": data.get("email"),
+            "name": data.get("name"),
+            "lastname": data.get("lastname"),
+            "register_at": datetime.fromisoformat(register_at) if register_at else None,
+            "is_active": data.get("is_active", False),
+            "is_superuser": data.get("is_superuser", False),
+            "is_verified": data.get("is_verified", False),
+        })
+        set_committed_value(user, "branches", [detached(Branch, {"id": branch_id}) for branch_id in data.get("branch_ids", [])])
+        return user
+
+
+def get_claims_jwt_strategy() -> ClaimsJWTStrategy:
+    return ClaimsJWTStrategy(secret=SECRET, lifetime_seconds=JWT_LIFETIME, token_audience=CLAIMS_AUDIENCE)
+
+claims_auth_backend = AuthenticationBackend(
+    name="jwt-claims",
+    transport=BearerTransport(tokenUrl="auth/jwt-claims/login"),
+    get_strategy=get_claims_jwt_strategy,
+)
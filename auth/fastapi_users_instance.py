@@ -1,10 +1,14 @@
 from fastapi_users import FastAPIUsers
 from uuid import UUID
 from models.user import User
-from .auth import auth_backend
+from config.config import JWT_CLAIMS_ENABLED
+from .auth import auth_backend, claims_auth_backend
 from .user_manager import get_user_manager
 
+# Токены с claims принимаются, только если они включены (JWT_CLAIMS_ENABLED)
+auth_backends = [auth_backend, claims_auth_backend] if JWT_CLAIMS_ENABLED else [auth_backend]
+
 fastapi_users = FastAPIUsers[User, UUID](
     get_user_manager,
-    [auth_backend],
+    auth_backends,
 )
\ No newline at end of file
@@ -0,0 +1,22 @@
+from typing import Optional, Tuple
+import anyio
+from fastapi_users.password import PasswordHelper
+
+from config.config import PASSWORD_HASH_CONCURRENCY
+
+password_helper = PasswordHelper()
+
+# argon2 и bcrypt отпускают GIL, поэтому хватает потоков. Ограничение не даёт
+# волне входов в начале смены занять все ядра: остальные запросы ждут меньше
+_limiter = anyio.CapacityLimiter(PASSWORD_HASH_CONCURRENCY)
+
+
+async def hash_password(password: str) -> str:
+    return await anyio.to_thread.run_sync(password_helper.hash, password, limiter=_limiter)
+
+
+async def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Проверяет пароль; второй элемент — новый хэш, если старый алгоритм устарел."""
+    return await anyio.to_thread.run_sync(
+        password_helper.verify_and_update, password, hashed_password, limiter=_limiter
+    )
@@ -0,0 +1,47 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from uuid import UUID
+from sqlalchemy import select
+
+from config.config import TOKEN_VERSIONS_REFRESH
+from config.database import async_session_maker
+from models import User
+
+
+class TokenVersions:
+    """
+    Версии токенов активных пользователей в памяти воркера.
+
+    Загружаются одним запросом не чаще раза в TOKEN_VERSIONS_REFRESH секунд,
+    поэтому проверка токена с claims не обращается к БД на каждый запрос.
+    Изменение, удаление или деактивация пользователя отзывают его токены
+    в этом воркере сразу, в остальных — не позже чем через TOKEN_VERSIONS_REFRESH секунд.
+    """
+
+    _versions: Dict[UUID, int] = {}
+    _loaded_at: float = 0.0
+    _lock = asyncio.Lock()
+
+    @staticmethod
+    def invalidate() -> None:
+        TokenVersions._loaded_at = 0.0
+
+    @staticmethod
+    async def _load() -> None:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(User.id, User.token_version).where(User.is_active == True)
+            )
+            TokenVersions._versions = {user_id: version or 0 for user_id, version in result.all()}
+        TokenVersions._loaded_at = time.monotonic()
+
+    @staticmethod
+    async def get(user_id: UUID) -> Optional[int]:
+        """Текущая версия токенов пользователя; None — пользователь удалён или неактивен."""
+        if time.monotonic() - TokenVersions._loaded_at > TOKEN_VERSIONS_REFRESH:
+            async with TokenVersions._lock:
+                # Пока ждали блокировку, версии мог обновить другой запрос
+                if time.monotonic() - TokenVersions._loaded_at > TOKEN_VERSIONS_REFRESH:
+                    await TokenVersions._load()
+        return TokenVersions._versions.get(user_id)
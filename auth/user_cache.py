@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from config.config import USER_CACHE_TTL, USER_CACHE_SIZE
+from models import User, Branch
+
+# Снимок пользователя: колонки пользователя и колонки его филиалов
+Snapshot = Tuple[Dict, List[Dict]]
+
+
+def _columns(obj) -> Dict:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def detached(model, values: Dict):
+    # Объект как будто загружен из БД и отсоединён от сессии: без истории изменений,
+    # поэтому session.add() не приведёт к INSERT
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
+
+class UserCache:
+    """
+    LRU-кэш пользователей с филиалами в памяти воркера.
+
+    Хранятся снимки колонок, а не ORM-объекты: каждый запрос получает свой
+    экземпляр User, и изменения в одном обработчике не видны в других.
+    Другие воркеры узнают об изменениях пользователя не позже чем через USER_CACHE_TTL секунд.
+    """
+
+    _entries: "OrderedDict[UUID, Tuple[float, Snapshot]]" = OrderedDict()
+
+    @staticmethod
+    def get(user_id: UUID) -> Optional[User]:
+        entry = UserCache._entries.get(user_id)
+        if entry is None:
+            return None
+        stored_at, (user_values, branches_values) = entry
+        if time.monotonic() - stored_at > USER_CACHE_TTL:
+            UserCache._entries.pop(user_id, None)
+            return None
+        UserCache._entries.move_to_end(user_id)
+
+        user = detached(User, user_values)
+        set_committed_value(user, "branches", [detached(Branch, values) for values in branches_values])
+        return user
+
+    @staticmethod
+    def set(user: User) -> None:
+        UserCache._entries[user.id] = (
+            time.monotonic(),
+            (_columns(user), [_columns(branch) for branch in user.branches]),
+        )
+        UserCache._entries.move_to_end(user.id)
+        while len(UserCache._entries) > USER_CACHE_SIZE:
+            UserCache._entries.popitem(last=False)
+
+    @staticmethod
+    def invalidate(user_id: UUID) -> None:
+        UserCache._entries.pop(user_id, None)
+
+    @staticmethod
+    def clear() -> None:
+        """Сбрасывает весь кэш (например, после изменения филиалов)."""
+        UserCache._entries.clear()
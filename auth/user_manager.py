@@ -1,37 +1,128 @@
 # auth/user_manager.py
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import Depends, Request
-from fastapi_users import BaseUserManager, UUIDIDMixin
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, UUIDIDMixin, exceptions, schemas
 from sqlalchemy import select, UUID
 from sqlalchemy.orm import selectinload
 from models.user import User
 from config.config import SECRET
-from config.database import async_session_maker
 from fastapi_users.db import SQLAlchemyUserDatabase
 from sqlalchemy.ext.asyncio import AsyncSession
 from config.database import get_async_session
+from .user_cache import UserCache
+from .password import password_helper, hash_password, verify_and_update
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    def __init__(self, user_db):
+        super().__init__(user_db, password_helper)
+
     async def get(self, user_id: UUID) -> Optional[User]:
-        async with async_session_maker() as session:
-            result = await session.execute(
-                select(User)
-                .options(
-                    selectinload(User.branches),  # Подгружаем связанные филиалы
-                )
-                .where(User.id == user_id)
-            )
-            user = result.scalars().first()
-            await session.commit()
+        # Вызывается на каждый авторизованный запрос: повторные запросы обходятся без БД
+        user = UserCache.get(user_id)
+        if user is not None:
             return user
 
+        # Сессия запроса (get_async_session) общая с обработчиком: соединение берётся из пула
+        # при первом запросе и дальше используется обработчиком, второй сессии не открывается
+        session = self.user_db.session
+        result = await session.execute(
+            select(User)
+            .options(
+                selectinload(User.branches),  # Подгружаем связанные филиалы
+            )
+            .where(User.id == user_id)
+        )
+        user = result.scalars().first()
+        if user is not None:
+            # Отсоединяем, как и копии из кэша: rollback в обработчике не сбросит загруженные поля
+            for branch in user.branches:
+                session.expunge(branch)
+            session.expunge(user)
+            UserCache.set(user)
+        return user
+
+    # create, authenticate и _update повторяют BaseUserManager, но хэшируют
+    # и проверяют пароль в пуле потоков (auth/password.py), а не в цикле событий
+
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await hash_password(password)
+
+        created_user = await self.user_db.create(user_dict)
+
+        await self.on_after_register(created_user, request)
+
+        return created_user
+
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хэшируем и для несуществующего пользователя, чтобы время ответа не выдавало email
+            await hash_password(credentials.password)
+            return None
+
+        verified, updated_password_hash = await verify_and_update(credentials.password, user.hashed_password)
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        validated_update_dict = {}
+        for field, value in update_dict.items():
+            if field == "email" and value != user.email:
+                try:
+                    await self.get_by_email(value)
+                    raise exceptions.UserAlreadyExists()
+                except exceptions.UserNotExists:
+                    validated_update_dict["email"] = value
+                    validated_update_dict["is_verified"] = False
+            elif field == "password" and value is not None:
+                await self.validate_password(value, user)
+                validated_update_dict["hashed_password"] = await hash_password(value)
+            else:
+                validated_update_dict[field] = value
+        return await self.user_db.update(user, validated_update_dict)
+
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         pass
 
+    async def on_after_update(self, user: User, update_dict: Dict[str, Any], request: Optional[Request] = None):
+        UserCache.invalidate(user.id)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None):
+        UserCache.invalidate(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        UserCache.invalidate(user.id)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        UserCache.invalidate(user.id)
+
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
     yield SQLAlchemyUserDatabase(session, User)
 
@@ -0,0 +1,77 @@
+"""
+Пропускная способность и пиковая память загрузки через services.storage.
+
+Запуск:
+    python -m benchmarks.storage [--backend local|s3] [--sizes 1,16,128,1024]
+
+Для каждого размера (в МБ) данные генерируются порциями и отдаются в put()
+через read(n), как UploadFile, поэтому файл целиком в памяти не появляется.
+Выводятся МБ/с и пик памяти Python (tracemalloc) — он должен зависеть от размера
+части (S3_PART_SIZE x S3_UPLOAD_CONCURRENCY), а не от размера файла.
+Для s3 нужны ACCESS_KEY, SECRET_KEY, ENDPOINT_URL и BUCKET_NAME.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from config.config import ACCESS_KEY, SECRET_KEY, ENDPOINT_URL, BUCKET_NAME
+from services.s3 import S3Client
+from services.storage import S3Storage, LocalStorage
+
+MB = 1024 * 1024
+BLOCK = os.urandom(MB)
+
+
+def generated_reader(size: int):
+    remaining = size
+
+    async def read(n: int = -1) -> bytes:
+        nonlocal remaining
+        n = remaining if n < 0 else min(n, remaining)
+        remaining -= n
+        # Повторяем один случайный блок: генерация не попадает в замер
+        return (BLOCK * (n // MB + 1))[:n]
+
+    return read
+
+
+async def run(backend: str, sizes):
+    if backend == "s3":
+        storage = S3Storage(S3Client(ACCESS_KEY, SECRET_KEY, ENDPOINT_URL, BUCKET_NAME))
+    else:
+        storage = LocalStorage(tempfile.mkdtemp(prefix="storage-bench-"), "/storage/local")
+
+    print(f"{'size, MB':>10} {'seconds':>10} {'MB/s':>10} {'peak, MB':>10}")
+    try:
+        for size_mb in sizes:
+            key = f"benchmarks/{uuid.uuid4()}.bin"
+            tracemalloc.start()
+            started = time.perf_counter()
+            await storage.put(key, generated_reader(size_mb * MB))
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            await storage.delete(key)
+            print(f"{size_mb:>10} {elapsed:>10.2f} {size_mb / elapsed:>10.1f} {peak / MB:>10.1f}")
+    finally:
+        await storage.close()
+
+    # ru_maxrss в Linux в килобайтах
+    print(f"max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=("local", "s3"), default="local")
+    parser.add_argument("--sizes", default="1,16,128,1024", help="Размеры файлов в МБ через запятую")
+    args = parser.parse_args()
+    asyncio.run(run(args.backend, [int(size) for size in args.sizes.split(",")]))
+
+
+if __name__ == "__main__":
+    main()
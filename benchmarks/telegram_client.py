@@ -0,0 +1,126 @@
+"""
+Сравнение клиента на каждый запрос с общим пулом соединений (config.http_client)
+на локальном фейковом API Telegram.
+
+Запуск:
+    python -m benchmarks.telegram_client [--requests 500] [--concurrency 20]
+                                         [--certfile cert.pem --keyfile key.pem]
+
+Фейковый сервер отвечает 200 на любой POST и считает принятые TCP-соединения,
+поэтому в выводе видно, сколько раз оплачивалось установление соединения.
+С --certfile/--keyfile сервер работает по TLS и в замер попадает и TLS-рукопожатие.
+"""
+import argparse
+import asyncio
+import ssl
+import time
+from typing import Optional
+import httpx
+
+from config.http_client import TELEGRAM_LIMITS, TELEGRAM_TIMEOUT
+
+RESPONSE_BODY = b'{"ok":true}'
+
+
+class FakeTelegramAPI:
+    def __init__(self, ssl_context: Optional[ssl.SSLContext] = None):
+        self.ssl_context = ssl_context
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value.strip())
+                if length:
+                    await reader.readexactly(length)
+                self.requests += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(RESPONSE_BODY)).encode() + b"\r\n"
+                    b"Connection: keep-alive\r\n\r\n" + RESPONSE_BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0, ssl=self.ssl_context)
+        port = self.server.sockets[0].getsockname()[1]
+        scheme = "https" if self.ssl_context else "http"
+        return f"{scheme}://127.0.0.1:{port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def reset(self):
+        self.connections = 0
+        self.requests = 0
+
+
+async def _run(total: int, concurrency: int, send) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            response = await send({"telegram_chat_id": i, "count": 1})
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - started
+
+
+async def benchmark(total: int, concurrency: int, certfile: Optional[str], keyfile: Optional[str]):
+    ssl_context = None
+    if certfile:
+        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_context.load_cert_chain(certfile, keyfile)
+    verify = not certfile
+
+    api = FakeTelegramAPI(ssl_context)
+    url = f"{await api.start()}/api/v1/notification/china"
+
+    # Как было: новый клиент (и новое соединение) на каждый запрос
+    async def per_call(payload):
+        async with httpx.AsyncClient(timeout=TELEGRAM_TIMEOUT, verify=verify) as client:
+            return await client.post(url, json=[payload])
+
+    elapsed = await _run(total, concurrency, per_call)
+    print(f"клиент на запрос: {elapsed:.3f} c, {total / elapsed:.0f} запр/с, соединений: {api.connections}")
+    api.reset()
+
+    # Как стало: один клиент с пулом соединений
+    async with httpx.AsyncClient(limits=TELEGRAM_LIMITS, timeout=TELEGRAM_TIMEOUT, verify=verify) as client:
+        async def pooled(payload):
+            return await client.post(url, json=[payload])
+
+        elapsed = await _run(total, concurrency, pooled)
+    print(f"общий пул:        {elapsed:.3f} c, {total / elapsed:.0f} запр/с, соединений: {api.connections}")
+
+    await api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк HTTP-клиента для сервиса Telegram")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--certfile")
+    parser.add_argument("--keyfile")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.requests, args.concurrency, args.certfile, args.keyfile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.coder import JsonCoder
+from sqlalchemy import inspect as sa_inspect
+
+from config.config import CACHE_BACKEND, CACHE_PREFIX, REDIS_URL, WEB_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class CacheTag:
+    """Теги (namespace) кэша. Запись в соответствующую таблицу сбрасывает весь тег."""
+    STATUSES = "statuses"
+    BRANCHES = "branches"
+    PAYMENT_METHODS = "payment_methods"
+    TEXTES = "textes"
+    SETTINGS = "settings"
+    CHINA_ADDRESS = "china_address"
+    ADDRESS_FILES = "address_files"
+    SUMMARY = "summary"
+
+
+# Время жизни по умолчанию: справочники меняются редко и сбрасываются по тегу
+DEFAULT_EXPIRE = 60 * 60
+# Сводка меняется с каждой загрузкой, поэтому живёт недолго
+SUMMARY_EXPIRE = 15
+
+# Браузер хранит ответ, но перед показом сверяет ETag: сброс тега сразу виден клиентам.
+# fastapi-cache выставляет max-age=<ttl>, и копии в браузере invalidate() не достать
+CLIENT_CACHE_CONTROL = "no-cache, private"
+
+# Аргументы обработчика, которые не влияют на результат и не должны попадать в ключ
+_IGNORED_KWARGS = {"db", "session", "current_user", "user", "background_tasks"}
+
+_initialized = False
+
+
+def _to_primitive(value: Any) -> Any:
+    """Преобразует ORM-объекты в словари колонок, чтобы их можно было сериализовать в JSON."""
+    if isinstance(value, (list, tuple)):
+        return [_to_primitive(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_primitive(item) for key, item in value.items()}
+    if hasattr(value, "__mapper__"):
+        mapper = sa_inspect(value).mapper
+        return {attr.key: getattr(value, attr.key) for attr in mapper.column_attrs}
+    return value
+
+
+class ORMJsonCoder(JsonCoder):
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        return super().encode(_to_primitive(value))
+
+
+def user_scope_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Ключ кэша: namespace (тег) + область видимости пользователя + путь и параметры запроса.
+
+    Суперпользователь видит все филиалы, остальные — только свои, поэтому
+    результаты для разных наборов филиалов хранятся под разными ключами.
+    """
+    kwargs = kwargs or {}
+    user = kwargs.get("current_user") or kwargs.get("user")
+    if user is None or user.is_superuser:
+        scope = "all"
+    else:
+        scope = "branches:" + ",".join(sorted(str(b.id) for b in user.branches))
+
+    params = sorted((k, repr(v)) for k, v in kwargs.items() if k not in _IGNORED_KWARGS)
+    path = request.url.path if request else ""
+    raw = f"{func.__module__}:{func.__name__}:{path}:{params}"
+    return f"{namespace}:{scope}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def init_cache() -> None:
+    """Инициализирует fastapi-cache с выбранным бэкендом (CACHE_BACKEND)."""
+    global _initialized
+
+    if CACHE_BACKEND == "redis":
+        from redis import asyncio as aioredis
+        from fastapi_cache.backends.redis import RedisBackend
+
+        backend = RedisBackend(aioredis.from_url(REDIS_URL))
+    else:
+        if WEB_CONCURRENCY > 1:
+            logger.warning(
+                f"Кэш в памяти при {WEB_CONCURRENCY} воркерах: invalidate() сбрасывает его только в своём воркере, "
+                f"остальные отдают старые данные до истечения TTL. Задайте REDIS_URL"
+            )
+        backend = InMemoryBackend()
+
+    FastAPICache.init(
+        backend,
+        prefix=CACHE_PREFIX,
+        expire=DEFAULT_EXPIRE,
+        coder=ORMJsonCoder,
+        key_builder=user_scope_key_builder,
+    )
+    _initialized = True
+
+
+class ClientCacheControlMiddleware:
+    """
+    ASGI-middleware: у ответов из кэшируемых маршрутов (есть заголовок статуса кэша)
+    Cache-Control заменяется на CLIENT_CACHE_CONTROL. ETag остаётся, поэтому
+    повторный запрос с If-None-Match получает 304 без тела.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _initialized:
+            await self.app(scope, receive, send)
+            return
+
+        status_header = FastAPICache.get_cache_status_header().lower().encode()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                if any(name.lower() == status_header for name, _ in headers):
+                    message["headers"] = [
+                        (name, value) for name, value in headers if name.lower() != b"cache-control"
+                    ] + [(b"cache-control", CLIENT_CACHE_CONTROL.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+async def invalidate(*tags: str) -> None:
+    """Сбрасывает все закэшированные ответы с указанными тегами."""
+    if not _initialized:
+        return
+    for tag in tags:
+        try:
+            await FastAPICache.clear(namespace=tag)
+        except Exception as e:
+            logger.error(f"Не удалось сбросить кэш для тега {tag}: {e}")
@@ -23,8 +23,51 @@ TRANSIT_API_URL = f"{TELEGRAM_API_URL}/api/v1/notification/transit"
 CHINA_API_URL = f"{TELEGRAM_API_URL}/api/v1/notification/china"
 BISHKEK_API_URL = f"{TELEGRAM_API_URL}/api/v1/notification/bishkek"
 
+# Рассылка уведомлений: размер порции получателей, параллельность и число повторов
+TELEGRAM_CHUNK_SIZE = int(os.environ.get("TELEGRAM_CHUNK_SIZE", 200))
+TELEGRAM_CONCURRENCY = int(os.environ.get("TELEGRAM_CONCURRENCY", 4))
+TELEGRAM_RETRIES = int(os.environ.get("TELEGRAM_RETRIES", 3))
+
+# Ограничения исходящих запросов к сервису Telegram (на один воркер) и предохранитель
+TELEGRAM_RATE_RPS = float(os.environ.get("TELEGRAM_RATE_RPS", 20))
+TELEGRAM_RATE_RECIPIENTS = float(os.environ.get("TELEGRAM_RATE_RECIPIENTS", 1000))
+TELEGRAM_BREAKER_THRESHOLD = int(os.environ.get("TELEGRAM_BREAKER_THRESHOLD", 5))
+TELEGRAM_BREAKER_RESET = float(os.environ.get("TELEGRAM_BREAKER_RESET", 30))
+
+# Окно объединения уведомлений: загрузки одного типа за это время уходят клиенту одним сообщением
+NOTIFICATION_COALESCE_SECONDS = int(os.environ.get("NOTIFICATION_COALESCE_SECONDS", 300))
+# Аренда записи outbox на время отправки: после неё запись упавшего воркера забирает другой
+OUTBOX_LEASE_SECONDS = int(os.environ.get("OUTBOX_LEASE_SECONDS", 600))
+
+# Пользователь, от имени которого фоновые задачи пишут историю товаров
+SYSTEM_USER_ID = os.environ.get("SYSTEM_USER_ID")
+
 
 ACCESS_KEY = os.environ.get("ACCESS_KEY")
 SECRET_KEY = os.environ.get("SECRET_KEY")
 ENDPOINT_URL = os.environ.get("ENDPOINT_URL")
-BUCKET_NAME = os.environ.get("BUCKET_NAME")
\ No newline at end of file
+BUCKET_NAME = os.environ.get("BUCKET_NAME")
+# Загрузка в S3: размер части multipart (не меньше 5 МБ) и число частей, загружаемых одновременно
+S3_PART_SIZE = int(os.environ.get("S3_PART_SIZE", 8 * 1024 * 1024))
+S3_UPLOAD_CONCURRENCY = int(os.environ.get("S3_UPLOAD_CONCURRENCY", 4))
+# Хранилище документов: "s3" или "local" (файловая система, для разработки и CI)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "s3" if ENDPOINT_URL else "local")
+LOCAL_STORAGE_DIR = os.environ.get(
+    "LOCAL_STORAGE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage_data"),
+)
+
+REDIS_URL = os.environ.get("REDIS_URL")
+# "memory" — кэш в памяти процесса (тесты, один воркер), "redis" — общий кэш для нескольких воркеров
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "redis" if REDIS_URL else "memory")
+CACHE_PREFIX = os.environ.get("CACHE_PREFIX", "kaimono-cache")
+# Число воркеров (его же читают uvicorn и gunicorn): кэш в памяти сбрасывается только в своём воркере
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 1))
+# Кэш авторизованных пользователей в памяти воркера: время жизни записи (сек) и число пользователей
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 30))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 1024))
+# Токены с правами пользователя в claims (/auth/jwt-claims/login) и период обновления версий токенов (сек)
+JWT_CLAIMS_ENABLED = os.environ.get("JWT_CLAIMS_ENABLED", "false").lower() in ("1", "true", "yes")
+TOKEN_VERSIONS_REFRESH = int(os.environ.get("TOKEN_VERSIONS_REFRESH", 10))
+# Сколько паролей воркер хэширует/проверяет одновременно (в пуле потоков, вне цикла событий)
+PASSWORD_HASH_CONCURRENCY = int(os.environ.get("PASSWORD_HASH_CONCURRENCY", 2))
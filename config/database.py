@@ -21,5 +21,11 @@ engine = create_async_engine(
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+   """
+   Сессия на время запроса. FastAPI кэширует зависимость в пределах запроса,
+   поэтому обработчик и авторизация (get_user_db -> UserManager.get) получают
+   одну сессию. Соединение берётся из пула только при первом запросе к БД:
+   ответы из кэша, ошибки валидации и 404 до обращения к БД пул не занимают.
+   """
    async with async_session_maker() as session:
        yield session
\ No newline at end of file
@@ -0,0 +1,86 @@
+import importlib.util
+import logging
+from typing import Optional
+import httpx
+
+from config.config import (
+    TELEGRAM_API_KEY,
+    TELEGRAM_RATE_RPS,
+    TELEGRAM_RATE_RECIPIENTS,
+    TELEGRAM_BREAKER_THRESHOLD,
+    TELEGRAM_BREAKER_RESET,
+)
+from config.resilience import CircuitBreaker, GuardedTransport, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Пул соединений к сервису Telegram: соединения переиспользуются (keep-alive),
+# поэтому DNS, TCP и TLS оплачиваются один раз, а не на каждый запрос
+TELEGRAM_LIMITS = httpx.Limits(
+    max_connections=50,
+    max_keepalive_connections=20,
+    keepalive_expiry=60,
+)
+TELEGRAM_TIMEOUT = httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0)
+
+TELEGRAM_HEADERS = {
+    "accept": "application/json",
+    "Content-Type": "application/json",
+    "X-API-Key": TELEGRAM_API_KEY or "",
+}
+
+# HTTP/2 используется, только если установлен пакет h2 (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Общие для всех клиентов процесса: переживают пересоздание клиента
+telegram_breaker = CircuitBreaker(
+    "telegram", failure_threshold=TELEGRAM_BREAKER_THRESHOLD, reset_timeout=TELEGRAM_BREAKER_RESET
+)
+telegram_requests_limiter = TokenBucket(TELEGRAM_RATE_RPS)
+telegram_recipients_limiter = TokenBucket(TELEGRAM_RATE_RECIPIENTS)
+
+_telegram_client: Optional[httpx.AsyncClient] = None
+
+
+def create_telegram_client() -> httpx.AsyncClient:
+    transport = GuardedTransport(
+        httpx.AsyncHTTPTransport(limits=TELEGRAM_LIMITS, http2=HTTP2_AVAILABLE),
+        breaker=telegram_breaker,
+        requests_limiter=telegram_requests_limiter,
+        recipients_limiter=telegram_recipients_limiter,
+    )
+    return httpx.AsyncClient(headers=TELEGRAM_HEADERS, timeout=TELEGRAM_TIMEOUT, transport=transport)
+
+
+def get_telegram_state() -> dict:
+    """Состояние предохранителя и ограничителей скорости текущего воркера."""
+    return {
+        "breaker": telegram_breaker.state(),
+        "requests_per_second": telegram_requests_limiter.state(),
+        "recipients_per_second": telegram_recipients_limiter.state(),
+    }
+
+
+def get_telegram_client() -> httpx.AsyncClient:
+    """
+    Общий клиент для всех запросов к сервису Telegram.
+
+    Создаётся при старте приложения; в скриптах и задачах вне приложения
+    создаётся лениво при первом обращении.
+    """
+    global _telegram_client
+    if _telegram_client is None or _telegram_client.is_closed:
+        _telegram_client = create_telegram_client()
+    return _telegram_client
+
+
+async def start_http_clients() -> None:
+    get_telegram_client()
+    logger.info(f"Telegram HTTP клиент создан (http2={HTTP2_AVAILABLE})")
+
+
+async def close_http_clients() -> None:
+    global _telegram_client
+    if _telegram_client is not None:
+        await _telegram_client.aclose()
+        _telegram_client = None
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Запрос отклонён без обращения к сервису: предохранитель разомкнут."""
+
+
+class TokenBucket:
+    """
+    Ограничитель скорости «ведро токенов»: rate токенов в секунду, запас не больше capacity.
+
+    Состояние хранится в памяти процесса, поэтому лимит действует на один воркер.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.waiting = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1) -> None:
+        # Запрос больше ёмкости ведра ждёт полного ведра, а не вечно
+        tokens = min(tokens, self.capacity)
+        self.waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                while self.tokens < tokens:
+                    await asyncio.sleep((tokens - self.tokens) / self.rate)
+                    self._refill()
+                self.tokens -= tokens
+        finally:
+            self.waiting -= 1
+
+    def state(self) -> dict:
+        self._refill()
+        return {"rate": self.rate, "capacity": self.capacity, "tokens": round(self.tokens, 2), "waiting": self.waiting}
+
+
+class CircuitBreaker:
+    """
+    Предохранитель: после failure_threshold ошибок подряд размыкается на reset_timeout секунд
+    и отклоняет запросы сразу. Затем пропускает один пробный запрос (half_open):
+    успех замыкает цепь, ошибка снова размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.status = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """Разомкнут и время ожидания ещё не вышло — запросы будут отклонены."""
+        return self.status == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def before_request(self) -> None:
+        if self.status == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"Сервис {self.name} недоступен, запрос отклонён")
+            self.status = self.HALF_OPEN
+        if self.status == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(f"Сервис {self.name} проверяется, запрос отклонён")
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        if self.status != self.CLOSED:
+            logger.info(f"Предохранитель {self.name} замкнут")
+        self.status = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.status == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.status != self.OPEN:
+                logger.warning(f"Предохранитель {self.name} разомкнут после {self.failures} ошибок")
+            self.status = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Запрос прерван до ответа сервиса: пробный слот освобождается без изменения счётчиков."""
+        self._probe_in_flight = False
+
+    def state(self) -> dict:
+        return {
+            "status": self.OPEN if self.is_open else (self.HALF_OPEN if self.status == self.OPEN else self.status),
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in_seconds": (
+                round(self.reset_timeout - (time.monotonic() - self.opened_at), 1) if self.is_open else 0
+            ),
+        }
+
+
+class GuardedTransport(httpx.AsyncBaseTransport):
+    """
+    Транспорт httpx, пропускающий каждый запрос через предохранитель и ограничители скорости.
+
+    Число получателей запроса передаётся в extensions={"recipients": n} (по умолчанию 1).
+    Ошибками сервиса считаются сетевые ошибки, 429 и 5xx.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        breaker: CircuitBreaker,
+        requests_limiter: TokenBucket,
+        recipients_limiter: TokenBucket,
+    ):
+        self.transport = transport
+        self.breaker = breaker
+        self.requests_limiter = requests_limiter
+        self.recipients_limiter = recipients_limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.breaker.before_request()
+        try:
+            await self.requests_limiter.acquire()
+            await self.recipients_limiter.acquire(request.extensions.get("recipients", 1))
+            response = await self.transport.handle_async_request(request)
+        except httpx.TransportError:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+
+        if response.status_code == 429 or response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
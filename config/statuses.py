@@ -3,4 +3,9 @@ class BaseStatus:
     BISHKEK = "Можно забрать"
     CHINA = "В китае"
     TRANSIT = "В пути"
-    PIKED = "Забрали"
\ No newline at end of file
+    PIKED = "Забрали"
+
+# id статуса BISHKEK, под который построен частичный индекс ix_products_client_bishkek.
+# Код берёт id статусов по именам (StatusService.get_id), а при старте проверяет,
+# что этот id совпадает с id в справочнике statuses
+BISHKEK_STATUS_ID = 2
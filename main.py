@@ -1,20 +1,34 @@
+import logging
 import os
+from datetime import datetime, timedelta
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import pytz
 from routers.routers import routers
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
 from tasks.product.update import update_product_statuses_async
-from media import MEDIA_DIR
+from tasks.counter.reconcile import reconcile_counters_async
+from tasks.rollup.refresh import refresh_daily_rollups_async, rebuild_covered_rollups_async
+from tasks.cluster import cluster_job
+from tasks.notification.outbox import dispatch_outbox_async, purge_outbox_async
+from tasks.notification.broadcast import dispatch_broadcasts_async
+from media import MEDIA_DIR, MediaStaticFiles
+from config.cache import init_cache, ClientCacheControlMiddleware
+from config.http_client import start_http_clients, close_http_clients
+from services.storage import document_storage
+from services.status import StatusService
+from config.database import async_session_maker
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
 # Монтируем директорию media на уровне приложения
-app.mount("/media", StaticFiles(directory=MEDIA_DIR), name="media")
+app.mount("/media", MediaStaticFiles(directory=MEDIA_DIR), name="media")
 
 # Настройка CORS
 app.add_middleware(
@@ -24,6 +38,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Ответы из кэша не должны храниться в браузере без проверки (см. config/cache.py)
+app.add_middleware(ClientCacheControlMiddleware)
 
 
 @app.get("/")
@@ -34,9 +50,52 @@ scheduler = AsyncIOScheduler(timezone=pytz.timezone('Asia/Bishkek'))
 
 @app.on_event("startup")
 async def on_startup():
-    scheduler.add_job(update_product_statuses_async, IntervalTrigger(days=1))
+    init_cache()
+    await start_http_clients()
+    # id статусов по именам; заодно проверяется id для частичного индекса ix_products_client_bishkek
+    try:
+        async with async_session_maker() as db:
+            await StatusService.load_ids(db)
+    except Exception as e:
+        logger.error(f"Не удалось загрузить статусы при старте: {e}")
+    # Планировщик запущен в каждом воркере, cluster_job гарантирует один запуск на кластер
+    scheduler.add_job(
+        cluster_job("update_product_statuses", update_product_statuses_async, min_interval=timedelta(minutes=5)),
+        IntervalTrigger(minutes=10),
+    )
+    # Первый пересчёт сразу при старте, чтобы заполнить счётчики после деплоя
+    scheduler.add_job(
+        cluster_job("reconcile_counters", reconcile_counters_async, min_interval=timedelta(minutes=30)),
+        IntervalTrigger(hours=1),
+        next_run_time=datetime.now(scheduler.timezone),
+    )
+    scheduler.add_job(
+        cluster_job("refresh_daily_rollups", refresh_daily_rollups_async, min_interval=timedelta(minutes=30)),
+        IntervalTrigger(hours=1),
+    )
+    # Ночью агрегаты пересобираются целиком: правки старше ROLLUP_LOOKBACK_DAYS дней
+    scheduler.add_job(
+        cluster_job("rebuild_covered_rollups", rebuild_covered_rollups_async, min_interval=timedelta(hours=12)),
+        CronTrigger(hour=3, minute=30),
+    )
+    # Outbox разбирается всеми воркерами параллельно (SELECT ... FOR UPDATE SKIP LOCKED)
+    scheduler.add_job(dispatch_outbox_async, IntervalTrigger(seconds=10), max_instances=1, coalesce=True)
+    # Рассылки продолжаются с неотправленных получателей; страницы делятся между воркерами через SKIP LOCKED
+    scheduler.add_job(dispatch_broadcasts_async, IntervalTrigger(seconds=15), max_instances=1, coalesce=True)
+    scheduler.add_job(
+        cluster_job("purge_outbox", purge_outbox_async, min_interval=timedelta(minutes=30)),
+        IntervalTrigger(hours=1),
+    )
     print("start sheduler")
     scheduler.start()
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    await close_http_clients()
+    await document_storage.close()
+
+
 app.include_router(routers)
\ No newline at end of file
@@ -1,6 +1,28 @@
-
 import os
+import re
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MEDIA_DIR = os.path.join(BASE_DIR, "media")
\ No newline at end of file
+MEDIA_DIR = os.path.join(BASE_DIR, "media")
+
+# Файлы, названные по хэшу содержимого (services/media.py), никогда не меняются
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]{1,10})?$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class MediaStaticFiles(StaticFiles):
+    """
+    Раздача MEDIA_DIR: файлы с именем по хэшу отдаются с бессрочным кэшированием,
+    старые файлы по исходному имени — как раньше. Служебные каталоги (.tmp) не раздаются.
+    """
+
+    async def get_response(self, path: str, scope):
+        relative = path.replace(os.sep, "/")
+        if any(part.startswith(".") for part in relative.split("/")):
+            raise HTTPException(status_code=404)
+        response = await super().get_response(path, scope)
+        if response.status_code == 200 and CONTENT_ADDRESSED.match(relative):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
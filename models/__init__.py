@@ -3,13 +3,18 @@ from .client import Client
 from .product import Product
 from .branch import Branch
 from .config import Configuration
-from .notification import NotificationTask
+from .notification import NotificationTask, NotificationImage, notification_task_recipients
 from .payment import Payment, PaymentMethod, payment_products
 from .status import Status
 from .china import ChinaAddress
 from .product_history import ProductHistory
 from .textes import Text
 from .address_file import AddressPhoto, AddressVideo
+from .counter import ProductCounter, ClientCounter, ClientBalance
+from .rollup import DailyRollup, Watermark
+from .job_run import JobRun
+from .outbox import NotificationOutbox
+from .document import Document
 
 
 from config.config import Base
\ No newline at end of file
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, DECIMAL, func
+from config.config import Base
+
+# Товары без статуса/филиала учитываются под ключом 0 (NULL нельзя использовать в первичном ключе)
+NO_KEY = 0
+
+
+class ProductCounter(Base):
+    """Количество товаров в разрезе статус × филиал для дашборда."""
+    __tablename__ = 'product_counters'
+
+    status_id = Column(Integer, primary_key=True)
+    branch_id = Column(Integer, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class ClientCounter(Base):
+    """Количество клиентов в разрезе филиала для дашборда."""
+    __tablename__ = 'client_counters'
+
+    branch_id = Column(Integer, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class ClientBalance(Base):
+    """
+    Товары клиента, ожидающие выдачи (статус BISHKEK): количество, сумма к оплате и вес.
+    Обновляется вместе с товарами через CounterDelta, дрейф исправляет пересчёт счётчиков.
+    """
+    __tablename__ = 'client_balances'
+
+    client_id = Column(Integer, primary_key=True)
+    pending_count = Column(BigInteger, nullable=False, default=0)
+    pending_amount = Column(BigInteger, nullable=False, default=0)
+    pending_weight = Column(DECIMAL(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UUID, func
+from config.config import Base
+
+
+class Document(Base):
+    """Документ в хранилище; запись создаётся после загрузки по подписанной ссылке."""
+    __tablename__ = 'documents'
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String(1024), nullable=False, unique=True)  # ключ объекта в хранилище
+    name = Column(String(255), nullable=False)
+    content_type = Column(String(255), nullable=True)
+    uploaded_by_id = Column(UUID(as_uuid=True), ForeignKey('user.id'), nullable=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
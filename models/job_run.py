@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, func
+from config.config import Base
+
+
+class JobRun(Base):
+    """Журнал запусков фоновых задач планировщика."""
+    __tablename__ = 'job_runs'
+
+    id = Column(Integer, primary_key=True)
+    job_name = Column(String(100), nullable=False, index=True)
+    status = Column(String(20), nullable=False)  # 'success', 'error'
+    worker = Column(String(255), nullable=True)
+    started_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    rows_affected = Column(BigInteger, nullable=True)
+    error = Column(Text, nullable=True)
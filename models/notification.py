@@ -1,5 +1,5 @@
 from config.config import Base
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func, ForeignKey, Table, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, func, ForeignKey, Table, Text, Index, text
 from sqlalchemy.orm import relationship
 
 
@@ -8,10 +8,15 @@ class NotificationTask(Base):
     
     id = Column(Integer, primary_key=True)
     message = Column(Text, nullable=False)
-    status = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)  # 'pending', 'running', 'done', 'cancelled'
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     error_message = Column(Text, nullable=True)
+    total_recipients = Column(Integer, nullable=False, server_default=text("0"))
+    sent_count = Column(Integer, nullable=False, server_default=text("0"))
+    failed_count = Column(Integer, nullable=False, server_default=text("0"))
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
     
     recipients = relationship("Client", secondary="notification_task_recipients")
     images = relationship("NotificationImage", back_populates="task")  # Добавлена связь
@@ -27,10 +32,17 @@ class NotificationImage(Base):
     task = relationship("NotificationTask", back_populates="images")  # Исправлено
 
 
-# Таблица связи многие-ко-многим для задач уведомлений и получателей
+# Получатели рассылки: ключ — telegram_chat_id, client_id есть, если chat id принадлежит клиенту
 notification_task_recipients = Table(
     'notification_task_recipients',
     Base.metadata,
     Column('notification_task_id', Integer, ForeignKey('notification_tasks.id'), primary_key=True),
-    Column('client_id', Integer, ForeignKey('clients.id'), primary_key=True)
-)
\ No newline at end of file
+    Column('telegram_chat_id', String, primary_key=True),
+    Column('client_id', Integer, ForeignKey('clients.id'), nullable=True),
+    # Статус доставки получателю: 'pending', 'sent', 'failed'
+    Column('status', String(20), nullable=False, server_default=text("'pending'")),
+    Column('attempts', Integer, nullable=False, server_default=text("0")),
+    Column('sent_at', DateTime, nullable=True),
+    Column('error', Text, nullable=True),
+    Index('ix_notification_task_recipients_status', 'notification_task_id', 'status', 'telegram_chat_id'),
+)
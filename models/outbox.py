@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from config.config import Base
+
+
+class NotificationOutbox(Base):
+    """
+    Исходящие уведомления (transactional outbox).
+
+    Запись создаётся в той же транзакции, что и изменение товаров,
+    а отправляет её диспетчер (tasks/notification/outbox.py).
+    """
+    __tablename__ = 'notification_outbox'
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)  # 'china', 'transit', 'bishkek'
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # 'pending', 'sending', 'sent', 'failed', 'merged'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, server_default=func.now())
+    locked_until = Column(DateTime, nullable=True)  # срок аренды записи воркером ('sending')
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    chunk_results = Column(JSONB, nullable=True)  # итог по порциям последней попытки отправки
+    merged_into_id = Column(Integer, nullable=True)  # запись, в которую объединено уведомление ('merged')
+
+    __table_args__ = (
+        Index(
+            'ix_notification_outbox_pending',
+            'next_attempt_at',
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index(
+            'ix_notification_outbox_sending',
+            'locked_until',
+            postgresql_where=text("status = 'sending'"),
+        ),
+    )
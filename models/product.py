@@ -6,11 +6,14 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     DECIMAL,
+    Index,
     Table,
-    func
+    func,
+    text
 )
 from sqlalchemy.orm import relationship
 from config.config import Base
+from config.statuses import BISHKEK_STATUS_ID
 
 from .payment import payment_products
 
@@ -36,3 +39,12 @@ class Product(Base):
     branch = relationship("Branch", back_populates="products")
     payments = relationship("Payment", secondary=payment_products, back_populates="products")
     history = relationship("ProductHistory", back_populates="product")
+
+    __table_args__ = (
+        # Товары, ожидающие выдачи, по клиенту: стойка выдачи (/take) не читает всю историю клиента
+        Index(
+            'ix_products_client_bishkek',
+            'client_id',
+            postgresql_where=text(f"status_id = {BISHKEK_STATUS_ID}"),
+        ),
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, String, DECIMAL, func
+from config.config import Base
+
+
+class DailyRollup(Base):
+    """
+    Дневные агрегаты по выданным товарам и оплатам.
+
+    Ключ: день × филиал × способ оплаты × клиент (отсутствующие значения — 0,
+    как в счётчиках дашборда).
+    """
+    __tablename__ = 'daily_rollups'
+
+    day = Column(Date, primary_key=True)
+    branch_id = Column(Integer, primary_key=True)
+    payment_method_id = Column(Integer, primary_key=True)
+    client_id = Column(Integer, primary_key=True)
+
+    products_count = Column(BigInteger, nullable=False, default=0)
+    total_weight = Column(DECIMAL(14, 2), nullable=False, default=0)
+    total_price = Column(BigInteger, nullable=False, default=0)
+    min_take_time = Column(DateTime, nullable=True)
+    max_take_time = Column(DateTime, nullable=True)
+    payments_count = Column(BigInteger, nullable=False, default=0)
+    payments_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class Watermark(Base):
+    """Отметки прогресса фоновых задач (например, до какого дня построены агрегаты)."""
+    __tablename__ = 'watermarks'
+
+    name = Column(String(100), primary_key=True)
+    value = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
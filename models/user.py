@@ -17,6 +17,8 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     name = Column(String, nullable=True)
     lastname = Column(String, nullable=True)
     register_at = Column(DateTime, nullable=True)
+    # Увеличивается при изменении пользователя: токены со старой версией перестают приниматься
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     branches = relationship("Branch", secondary=user_branches, back_populates="users")
     payments = relationship("Payment", back_populates="taken_by")
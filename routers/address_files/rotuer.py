@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, File, Form, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from config.database import get_async_session
 from auth.fastapi_users_instance import fastapi_users
+from fastapi_cache.decorator import cache
+from config.cache import CacheTag, invalidate
 
 from models import User, AddressPhoto, AddressVideo
 from schemas.address_file import (
     AddressPhotoCreate, AddressPhotoRead, AddressPhotoUpdate,
     AddressVideoCreate, AddressVideoRead, AddressVideoUpdate
 )
+from services.image import ImageError, ImageVariants
+from services.media import MediaStore
+
 router = APIRouter(prefix="/address-file", tags=["address-file"])
 
+ADDRESS_PHOTO_SIZE = "large"
+
 # --------------------- PHOTO ---------------------
 
 @router.post("/photo", response_model=AddressPhotoRead)
@@ -22,11 +29,42 @@ async def create_photo(
     obj = AddressPhoto(**data.dict())
     db.add(obj)
     await db.commit()
+    await invalidate(CacheTag.ADDRESS_FILES)
+    await db.refresh(obj)
+    return obj
+
+
+# Загрузка фото адреса: оригинал хранится по хэшу содержимого, в url — публичная ссылка
+# на уменьшенную копию в /media (подписанная ссылка /images истекла бы, а токена у <img> и бота нет)
+@router.post("/photo/upload", response_model=AddressPhotoRead)
+async def upload_photo(
+    request: Request,
+    name: str = Form(...),
+    active: bool = Form(False),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(fastapi_users.current_user(verified=True))
+):
+    try:
+        media_name = await MediaStore.save_upload(file)
+    finally:
+        await file.close()
+    try:
+        await ImageVariants.get(media_name, ADDRESS_PHOTO_SIZE)
+    except ImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    url = ImageVariants.media_url(str(request.base_url), media_name, ADDRESS_PHOTO_SIZE)
+    obj = AddressPhoto(name=name, url=url, active=active)
+    db.add(obj)
+    await db.commit()
+    await invalidate(CacheTag.ADDRESS_FILES)
     await db.refresh(obj)
     return obj
 
 
 @router.get("/photo", response_model=list[AddressPhotoRead])
+@cache(namespace=CacheTag.ADDRESS_FILES)
 async def list_photos(
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(fastapi_users.current_user(verified=True))
@@ -36,6 +74,7 @@ async def list_photos(
 
 
 @router.get("/photo/{photo_id}", response_model=AddressPhotoRead)
+@cache(namespace=CacheTag.ADDRESS_FILES)
 async def get_photo(
     photo_id: int,
     db: AsyncSession = Depends(get_async_session),
@@ -60,6 +99,7 @@ async def delete_photo(
         raise HTTPException(status_code=404, detail="Photo not found")
     await db.delete(photo)
     await db.commit()
+    await invalidate(CacheTag.ADDRESS_FILES)
     return {"detail": "Photo deleted"}
 
 @router.put("/photo/{photo_id}", response_model=AddressPhotoRead)
@@ -78,6 +118,7 @@ async def update_photo(
         setattr(photo, field, value)
 
     await db.commit()
+    await invalidate(CacheTag.ADDRESS_FILES)
     await db.refresh(photo)
     return photo
 
@@ -92,11 +133,13 @@ async def create_video(
     obj = AddressVideo(**data.dict())
     db.add(obj)
     await db.commit()
+    await invalidate(CacheTag.ADDRESS_FILES)
     await db.refresh(obj)
     return obj
 
 
 @router.get("/video", response_model=list[AddressVideoRead])
+@cache(namespace=CacheTag.ADDRESS_FILES)
 async def list_videos(
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(fastapi_users.current_user(verified=True))
@@ -106,6 +149,7 @@ async def list_videos(
 
 
 @router.get("/video/{video_id}", response_model=AddressVideoRead)
+@cache(namespace=CacheTag.ADDRESS_FILES)
 async def get_video(
     video_id: int,
     db: AsyncSession = Depends(get_async_session),
@@ -130,6 +174,7 @@ async def delete_video(
         raise HTTPException(status_code=404, detail="Video not found")
     await db.delete(video)
     await db.commit()
+    await invalidate(CacheTag.ADDRESS_FILES)
     return {"detail": "Video deleted"}
 
 @router.put("/video/{video_id}", response_model=AddressVideoRead)
@@ -148,5 +193,6 @@ async def update_video(
         setattr(video, field, value)
 
     await db.commit()
+    await invalidate(CacheTag.ADDRESS_FILES)
     await db.refresh(video)
     return video
\ No newline at end of file
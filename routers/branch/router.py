@@ -7,6 +7,8 @@ from services.branch import BranchService
 from schemas.branch import BranchResponse, BranchCreate, BranchUpdate
 from models import User
 from auth.fastapi_users_instance import fastapi_users
+from fastapi_cache.decorator import cache
+from config.cache import CacheTag
 
 
 router = APIRouter(prefix="/branches", tags=["branches"])
@@ -23,6 +25,7 @@ async def create_branch(
 
 # Read (one)
 @router.get("/{branch_id}", response_model=BranchResponse)
+@cache(namespace=CacheTag.BRANCHES)
 async def read_branch(branch_id: int, db: AsyncSession = Depends(get_async_session), current_user: User = Depends(fastapi_users.current_user(verified=True))):
     db_branch = await BranchService.get_branch(db, branch_id)
     if db_branch is None:
@@ -31,6 +34,7 @@ async def read_branch(branch_id: int, db: AsyncSession = Depends(get_async_sessi
 
 # Read (all)
 @router.get("/", response_model=list[BranchResponse])
+@cache(namespace=CacheTag.BRANCHES)
 async def read_branches(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_session), current_user: User = Depends(fastapi_users.current_user(verified=True))):
     branches = await BranchService.get_all_branches(db, skip=skip, limit=limit)
     return branches
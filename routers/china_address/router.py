@@ -4,6 +4,9 @@ from config.database import get_async_session
 from models import ChinaAddress
 from auth.fastapi_users_instance import fastapi_users
 from models.user import User
+from fastapi_cache.decorator import cache
+from config.cache import CacheTag, invalidate
+from services.template import TemplateService
 
 router = APIRouter(prefix="/china-address", tags=["china-address"])
 
@@ -11,6 +14,7 @@ current_user = fastapi_users.current_user(active=True)
 
 # Получение или создание экземпляра ChinaAddress
 @router.get("/instance")
+@cache(namespace=CacheTag.CHINA_ADDRESS)
 async def get_china_address(
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(current_user)
@@ -37,6 +41,8 @@ async def update_china_address(
     china_address.name2 = name2
     china_address.name3 = name3
     await china_address.save(db)
+    await invalidate(CacheTag.CHINA_ADDRESS)
+    TemplateService.invalidate()
     return {
         "message": "Адрес успешно обновлён",
         "id": china_address.id,
@@ -0,0 +1,39 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from auth.fastapi_users_instance import fastapi_users
+from media import IMMUTABLE_CACHE_CONTROL
+from models import User
+from services.image import FORMATS, ImageError, ImageVariants
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+MEDIA_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+PRIVATE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+# Уменьшенная копия изображения из /media: для пользователя с токеном
+# или по подписанной ссылке (ImageVariants.signed_url), которую получает бот
+@router.get("/{size}/{name:path}")
+async def get_image_variant(
+    size: str,
+    name: str,
+    format: str = Query("jpeg", description=", ".join(FORMATS)),
+    expires: Optional[int] = Query(None),
+    signature: Optional[str] = Query(None),
+    current_user: Optional[User] = Depends(fastapi_users.current_user(optional=True, verified=True)),
+):
+    signed = expires is not None and bool(signature) and ImageVariants.verify_link(name, size, expires, signature)
+    if current_user is None and not signed:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    try:
+        path = await ImageVariants.get(name, size, format)
+    except ImageError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[format],
+        # Ответ по токену не должен попадать в общие кэши: в URL нет подписи
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL if signed else PRIVATE_CACHE_CONTROL},
+    )
@@ -0,0 +1,26 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.fastapi_users_instance import fastapi_users
+from config.database import get_async_session
+from schemas.job_run import JobRunResponse
+from services.job_run import JobRunService
+from models import User
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
+
+
+# Журнал запусков фоновых задач
+@router.get("/runs", response_model=List[JobRunResponse])
+async def read_job_runs(
+    job_name: Optional[str] = Query(None, description="Фильтр по имени задачи"),
+    status: Optional[str] = Query(None, description="Фильтр по статусу (success, error)"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_superuser)
+):
+    runs = await JobRunService.get_runs(db, job_name=job_name, status=status, skip=skip, limit=limit)
+    return runs
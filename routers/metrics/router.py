@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth.fastapi_users_instance import fastapi_users
+from config.database import get_async_session
+from config.http_client import get_telegram_state
+from services.outbox import OutboxService
+from models import User
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+# Глубина очереди и задержка outbox уведомлений
+@router.get("/outbox")
+async def outbox_metrics(
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(fastapi_users.current_user(verified=True))
+):
+    return await OutboxService.get_stats(db)
+
+
+
+# Предохранитель и ограничители скорости запросов к сервису Telegram (текущий воркер)
+@router.get("/telegram")
+async def telegram_metrics(
+    current_user: User = Depends(fastapi_users.current_user(verified=True))
+):
+    return get_telegram_state()
@@ -6,6 +6,8 @@ from schemas.payment import PaymentMethodCreate, PaymentMethodUpdate, PaymentMet
 from services.payment import PaymentMethodService
 from config.database import get_async_session
 from models.user import User
+from fastapi_cache.decorator import cache
+from config.cache import CacheTag
 
 router = APIRouter(prefix="/payment-methods", tags=["payment-methods"])
 
@@ -21,6 +23,7 @@ async def create_payment_method(
     return db_method
 
 @router.get("/{method_id}", response_model=PaymentMethodResponse)
+@cache(namespace=CacheTag.PAYMENT_METHODS)
 async def read_payment_method(
     method_id: int,
     db: AsyncSession = Depends(get_async_session),
@@ -32,6 +35,7 @@ async def read_payment_method(
     return db_method
 
 @router.get("/", response_model=list[PaymentMethodResponse])
+@cache(namespace=CacheTag.PAYMENT_METHODS)
 async def read_payment_methods(
     skip: int = 0,
     limit: int = 100,
@@ -17,6 +17,9 @@ from .telegram.router import router as telegram
 from .text.router import router as text
 from .address_files.rotuer import router as address_files
 from .storage.router import router as storage
+from .job.router import router as job
+from .metrics.router import router as metrics
+from .image.router import router as image
 
 routers = APIRouter()
 
@@ -35,4 +38,7 @@ routers.include_router(china_address)
 routers.include_router(telegram)
 routers.include_router(text)
 routers.include_router(address_files)
-routers.include_router(storage)
\ No newline at end of file
+routers.include_router(storage)
+routers.include_router(job)
+routers.include_router(metrics)
+routers.include_router(image)
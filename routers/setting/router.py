@@ -5,6 +5,8 @@ from schemas.setting import ConfigurationResponse, ConfigurationBase, Configurat
 from services.settng import SettingService
 from config.database import get_async_session
 from models import Configuration, User
+from fastapi_cache.decorator import cache
+from config.cache import CacheTag
 
 router = APIRouter(prefix="/settings", tags=["setting"])
 
@@ -20,6 +22,7 @@ async def create_setting(
 
 # Read (one)
 @router.get("/{setting_id}")
+@cache(namespace=CacheTag.SETTINGS)
 async def read_branch(
     setting_id: int, 
     db: AsyncSession = Depends(get_async_session), 
@@ -31,6 +34,7 @@ async def read_branch(
     return setting
 
 @router.get("/")
+@cache(namespace=CacheTag.SETTINGS)
 async def get_all_settings(
     skip: int = 0, 
     limit: int = 100,
@@ -5,6 +5,8 @@ from schemas.status import StatusCreate, StatusUpdate, StatusResponse
 from services.status import StatusService
 from config.database import get_async_session
 from models.user import User
+from fastapi_cache.decorator import cache
+from config.cache import CacheTag
 
 router = APIRouter(prefix="/statuses", tags=["statuses"])
 
@@ -21,6 +23,7 @@ async def create_status(
 
 # Read (one)
 @router.get("/{status_id}", response_model=StatusResponse)
+@cache(namespace=CacheTag.STATUSES)
 async def read_status(
     status_id: int,
     db: AsyncSession = Depends(get_async_session),
@@ -33,6 +36,7 @@ async def read_status(
 
 # Read (all)
 @router.get("/", response_model=list[StatusResponse])
+@cache(namespace=CacheTag.STATUSES)
 async def read_statuses(
     skip: int = 0,
     limit: int = 100,
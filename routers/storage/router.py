@@ -1,22 +1,59 @@
-from fastapi import APIRouter, File, UploadFile, Depends
+import logging
+import math
+import os
+from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List
+from botocore.exceptions import ClientError
+from sqlalchemy.ext.asyncio import AsyncSession
 from auth.fastapi_users_instance import fastapi_users
-from .s3 import S3Client
-from config.config import ACCESS_KEY, SECRET_KEY, ENDPOINT_URL, BUCKET_NAME
+from config.config import S3_PART_SIZE
+from config.database import get_async_session
+from schemas.storage import (
+    PresignUploadRequest,
+    MultipartCompleteRequest,
+    MultipartAbortRequest,
+    UploadConfirmRequest,
+    DocumentRead,
+)
+from services.document import DocumentService
+from services.storage import document_storage, S3Storage, LocalStorage, iterator_reader
 from models import User
-import aiofiles
 import uuid
 import asyncio
-import os
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/storage", tags=["storage"])
 
-s3_client = S3Client(
-    access_key=ACCESS_KEY,
-    secret_key=SECRET_KEY,
-    endpoint_url=ENDPOINT_URL,
-    bucket_name=BUCKET_NAME,
-)
+DOCS_FOLDER = "kaimono/cargo/docs"
+PRESIGN_EXPIRES = 3600
+# S3 допускает не больше 10000 частей в одной загрузке
+MAX_PARTS = 10000
+
+current_superuser = fastapi_users.current_user(superuser=True)
+
+
+def _docs_key(key: str) -> str:
+    # Через подписанные ссылки доступны только документы, а не весь бакет
+    if not key.startswith(f"{DOCS_FOLDER}/") or ".." in key.split("/"):
+        raise HTTPException(status_code=400, detail="Недопустимый ключ объекта")
+    return key
+
+
+def _s3_storage() -> S3Storage:
+    # Multipart-загрузка по подписанным ссылкам есть только у S3
+    if not isinstance(document_storage, S3Storage):
+        raise HTTPException(status_code=400, detail="Хранилище не поддерживает загрузку частями")
+    return document_storage
+
+
+def _local_storage(key: str, method: str, expires: int, signature: str) -> LocalStorage:
+    if not isinstance(document_storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not document_storage.verify(key, method, expires, signature):
+        raise HTTPException(status_code=403, detail="Ссылка недействительна или устарела")
+    return document_storage
 
 @router.post("/upload")
 async def upload_files(
@@ -24,13 +61,130 @@ async def upload_files(
     current_user: User = Depends(fastapi_users.current_user(superuser=True))
 ):
     async def process_file(file: UploadFile):
-        temp_filename = f"temp_{uuid.uuid4()}_{file.filename}"
-        async with aiofiles.open(temp_filename, "wb") as w:
-            while chunk := await file.read(1024 * 1024):
-                await w.write(chunk)
-
-        url = await s3_client.upload_file(temp_filename, folder="kaimono/cargo/docs")
-        return url
+        # Файл потоком уходит в хранилище частями, без временной копии на диске
+        key = f"{DOCS_FOLDER}/{uuid.uuid4()}_{os.path.basename(file.filename)}"
+        try:
+            return await document_storage.put(key, file.read, file.content_type)
+        except (ClientError, OSError) as e:
+            logger.error(f"Error uploading file: {e}")
+            return None
 
     uploaded_urls = await asyncio.gather(*[process_file(f) for f in files])
-    return {"uploaded_urls": uploaded_urls}
\ No newline at end of file
+    return {"uploaded_urls": uploaded_urls}
+
+
+# Подписанная ссылка для загрузки напрямую в бакет: файл не проходит через API.
+# Для size больше S3_PART_SIZE выдаются ссылки на части multipart-загрузки
+@router.post("/presign/upload")
+async def presign_upload(
+    data: PresignUploadRequest,
+    current_user: User = Depends(current_superuser)
+):
+    key = f"{DOCS_FOLDER}/{uuid.uuid4()}_{os.path.basename(data.filename)}"
+    try:
+        if isinstance(document_storage, S3Storage) and data.size is not None and data.size > S3_PART_SIZE:
+            part_size = max(S3_PART_SIZE, math.ceil(data.size / MAX_PARTS))
+            multipart = await document_storage.client.create_presigned_multipart(
+                key, math.ceil(data.size / part_size), data.content_type, expires_in=PRESIGN_EXPIRES
+            )
+            return {"key": key, "part_size": part_size, "expires_in": PRESIGN_EXPIRES, **multipart}
+
+        url = await document_storage.presign(key, "PUT", PRESIGN_EXPIRES, data.content_type)
+        return {"key": key, "url": url, "expires_in": PRESIGN_EXPIRES}
+    except ClientError as e:
+        raise HTTPException(status_code=502, detail=f"Ошибка хранилища: {e}")
+
+
+@router.post("/presign/multipart/complete")
+async def complete_multipart(
+    data: MultipartCompleteRequest,
+    current_user: User = Depends(current_superuser)
+):
+    key = _docs_key(data.key)
+    storage = _s3_storage()
+    try:
+        url = await storage.client.complete_multipart(key, data.upload_id, [part.dict() for part in data.parts])
+    except ClientError as e:
+        raise HTTPException(status_code=400, detail=f"Не удалось завершить загрузку: {e}")
+    return {"key": key, "url": url}
+
+
+@router.post("/presign/multipart/abort")
+async def abort_multipart(
+    data: MultipartAbortRequest,
+    current_user: User = Depends(current_superuser)
+):
+    key = _docs_key(data.key)
+    storage = _s3_storage()
+    try:
+        await storage.client.abort_multipart(key, data.upload_id)
+    except ClientError as e:
+        raise HTTPException(status_code=400, detail=f"Не удалось отменить загрузку: {e}")
+    return {"detail": "Загрузка отменена"}
+
+
+# Подтверждение прямой загрузки (после PUT или /presign/multipart/complete): API записывает только ключ объекта
+@router.post("/presign/confirm", response_model=DocumentRead)
+async def confirm_upload(
+    data: UploadConfirmRequest,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(current_superuser)
+):
+    key = _docs_key(data.key)
+    try:
+        exists = await document_storage.exists(key)
+    except ClientError as e:
+        raise HTTPException(status_code=502, detail=f"Ошибка хранилища: {e}")
+    if not exists:
+        raise HTTPException(status_code=404, detail="Объект не найден в хранилище")
+
+    document = await DocumentService.record(session, key, data.content_type, current_user.id)
+    return DocumentRead.model_validate(document).model_copy(update={"url": document_storage.url(key)})
+
+
+# Временная ссылка на скачивание документа
+@router.get("/presign/download")
+async def presign_download(
+    key: str = Query(...),
+    current_user: User = Depends(fastapi_users.current_user(verified=True))
+):
+    key = _docs_key(key)
+    try:
+        url = await document_storage.presign(key, "GET", PRESIGN_EXPIRES)
+    except ClientError as e:
+        raise HTTPException(status_code=502, detail=f"Ошибка хранилища: {e}")
+    return {"key": key, "url": url, "expires_in": PRESIGN_EXPIRES}
+
+
+# Приём и выдача файлов по подписанным ссылкам локального хранилища (STORAGE_BACKEND=local).
+# Ссылки выдают /presign/upload и /presign/download, как и для S3
+@router.put("/local/{key:path}")
+async def local_put(
+    key: str,
+    request: Request,
+    method: str = Query(...),
+    expires: int = Query(...),
+    signature: str = Query(...),
+):
+    storage = _local_storage(key, method, expires, signature)
+    if method != "PUT":
+        raise HTTPException(status_code=403, detail="Ссылка недействительна или устарела")
+    await storage.put(key, iterator_reader(request.stream()))
+    return {"key": key}
+
+
+@router.get("/local/{key:path}")
+async def local_get(
+    key: str,
+    method: str = Query(...),
+    expires: int = Query(...),
+    signature: str = Query(...),
+):
+    storage = _local_storage(key, method, expires, signature)
+    if method != "GET" or not await storage.exists(key):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return StreamingResponse(
+        storage.stream(key),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{os.path.basename(key)}"'},
+    )
@@ -1,15 +1,19 @@
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from typing import List
 from fastapi import APIRouter, Depends, Form, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, insert, select
+from sqlalchemy import Integer, any_, bindparam, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from auth.fastapi_users_instance import fastapi_users
 from config.database import get_async_session
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from config.statuses import BaseStatus
 from models import User, Client, Product, Payment, PaymentMethod, Status, payment_products, ProductHistory
-from services.product_history import ProductHistoryManager
+from services.counter import CounterDelta, CounterService
+from services.status import StatusService
 
 
 
@@ -23,20 +27,46 @@ async def client_code(
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(fastapi_users.current_user(verified=True))
 ):
-    query = (
-        select(Client)
-        .where(Client.numeric_code == code)
-        .options(selectinload(Client.products).joinedload(Product.status))
-    )
-    result = await db.execute(query)
+    result = await db.execute(select(Client).where(Client.numeric_code == code))
     client = result.scalars().first()
 
     if client:
-        # Фильтруем продукты с нужным статусом
-        client.products = [p for p in client.products if p.status and p.status.name == BaseStatus.BISHKEK]
+        # Только товары, которые можно забрать: фильтр в SQL по частичному индексу ix_products_client_bishkek.
+        # id статуса (тот же, что в /take/issue) подставляется литералом, иначе подготовленный
+        # запрос не сможет использовать индекс
+        bishkek_id = await StatusService.get_id(db, BaseStatus.BISHKEK)
+        products = []
+        if bishkek_id is not None:
+            products_result = await db.execute(
+                select(Product)
+                .options(joinedload(Product.status))
+                .where(
+                    Product.client_id == client.id,
+                    Product.status_id == literal(bishkek_id, literal_execute=True),
+                )
+                .order_by(Product.id)
+            )
+            products = products_result.scalars().all()
+        set_committed_value(client, "products", products)
 
     return client
 
+
+# Сумма к оплате по клиенту: количество, стоимость и вес товаров, ожидающих выдачи
+@router.get("/{code}/balance")
+async def client_balance(
+    code: int,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(fastapi_users.current_user(verified=True))
+):
+    result = await db.execute(select(Client.id, Client.code).where(Client.numeric_code == code))
+    client = result.first()
+    if not client:
+        raise HTTPException(status_code=404, detail="Клиент не найден")
+
+    balance = await CounterService.get_client_balance(db, client.id)
+    return {**balance, "code": client.code}
+
 # Маршрут для выдачи товаров
 @router.post("/issue")
 async def take_issue(
@@ -66,40 +96,67 @@ async def take_issue(
         if not payment_method_obj:
             raise HTTPException(status_code=404, detail="Выбранный способ оплаты недоступен")
 
-        # Получаем статус "PIKED"
-        status_query = select(Status).where(Status.name == BaseStatus.PIKED)
-        status_result = await db.execute(status_query)
-        status_piked = status_result.scalars().first()
-        if not status_piked:
+        # Получаем статусы "BISHKEK" и "PIKED"
+        bishkek_id = await StatusService.get_id(db, BaseStatus.BISHKEK)
+        piked_id = await StatusService.get_id(db, BaseStatus.PIKED)
+        if bishkek_id is None or piked_id is None:
             raise HTTPException(status_code=404, detail="Статус 'PIKED' не найден")
 
-        # Обновляем товары
-        products_query = select(Product).where(Product.id.in_(selected_products))
-        result = await db.execute(products_query)
-        products_to_update = result.scalars().all()
-        if not products_to_update:
-            raise HTTPException(status_code=404, detail="Выбранные товары не найдены")
-
-        total_price = sum(product.price or 0 for product in products_to_update)
-
-        for product in products_to_update:
-            product.status_id = status_piked.id
-            product.date = datetime.now(timezone(timedelta(hours=6))).date()
-            
-            # Устанавливаем даты через ProductHistoryManager
-            ProductHistoryManager.apply_status_dates(product, BaseStatus.PIKED)
-            
-            db.add(product)
-
-            # Создаем запись в ProductHistory через ProductHistoryManager
-            await ProductHistoryManager.log_action(
-                db=db,
-                product=product,
-                action="issued",
-                user=current_user,
-                client_code=client.code
+        # Блокируем товары, которые ещё можно выдать. Строки, которые прямо сейчас выдаёт
+        # другой кассир, пропускаются (SKIP LOCKED), а не ждут его транзакцию
+        requested_ids = set(selected_products)
+        ids = bindparam("ids", value=list(requested_ids), type_=ARRAY(Integer))
+        locked_result = await db.execute(
+            select(Product.id)
+            .where(Product.id == any_(ids), Product.status_id == bishkek_id)
+            .with_for_update(skip_locked=True)
+        )
+        locked_ids = locked_result.scalars().all()
+        if not locked_ids:
+            raise HTTPException(status_code=404, detail="Выбранные товары не найдены или уже выданы")
+        if len(locked_ids) != len(requested_ids):
+            unavailable = sorted(requested_ids - set(locked_ids))
+            raise HTTPException(
+                status_code=409,
+                detail=f"Товары уже выданы или выдаются другим кассиром: {unavailable}",
             )
 
+        # Все товары переводятся в "PIKED" одним UPDATE ... RETURNING.
+        # Даты — как в ProductHistoryManager.apply_status_dates для PIKED: меняется только take_time
+        now = datetime.now(timezone(timedelta(hours=6)))
+        update_result = await db.execute(
+            update(Product)
+            .where(Product.id == any_(bindparam("locked_ids", value=locked_ids, type_=ARRAY(Integer))))
+            .values(status_id=piked_id, date=now.date(), take_time=now.replace(tzinfo=None))
+            .returning(Product.id, Product.product_code, Product.price, Product.weight, Product.branch_id, Product.client_id)
+            .execution_options(synchronize_session=False)
+        )
+        issued = update_result.all()
+
+        total_price = sum(row.price or 0 for row in issued)
+
+        counters = CounterDelta()
+        for branch_id, count in Counter(row.branch_id for row in issued).items():
+            counters.move(bishkek_id, branch_id, piked_id, branch_id, count)
+        for row in issued:
+            counters.remove_balance(row.client_id, bishkek_id, row.price, row.weight)
+
+        # История одной вставкой (формат описания — как в ProductHistoryManager.log_action)
+        action_at = now.replace(tzinfo=None)
+        await db.execute(
+            insert(ProductHistory),
+            [
+                {
+                    "product_id": row.id,
+                    "action": "issued",
+                    "action_by_id": current_user.id,
+                    "action_at": action_at,
+                    "description": f"Товар {row.product_code} issued пользователем {current_user.email} для клиента {client.code}"[:255],
+                }
+                for row in issued
+            ],
+        )
+
         # Создаем запись оплаты
         payment = Payment(
             client_id=client.id,
@@ -107,26 +164,30 @@ async def take_issue(
             payment_method_id=payment_method_obj.id,
             amount=total_price,
             taken_by_id=current_user.id,
-            paid_at=datetime.now(timezone(timedelta(hours=6))).replace(tzinfo=None)
+            paid_at=action_at
         )
         db.add(payment)
         await db.flush()  # Получаем payment.id для связи с товарами
 
         # Привязываем товары к оплате через таблицу payment_products
         payment_product_data = [
-            {"payment_id": payment.id, "product_id": product.id}
-            for product in products_to_update
+            {"payment_id": payment.id, "product_id": row.id}
+            for row in issued
         ]
         await db.execute(
             insert(payment_products),
             payment_product_data
         )
 
+        await counters.flush(db)
         await db.commit()
 
         return {
             "message": "Товары успешно выданы и оплата зафиксирована",
         }
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Ошибка при выдаче товаров: {str(e)}")
@@ -136,28 +197,15 @@ async def get_clients_products_stats(
     session: AsyncSession = Depends(get_async_session),
     # current_user: User = Depends(fastapi_users.current_user(verified=True))
     ):
-    stmt = (
-        select(
-            Client.id.label("client_id"),
-            Client.numeric_code.label("numeric_code"),
-            func.count(Product.id).label("product_count"),
-            func.coalesce(func.sum(Product.price), 0).label("total_product_price")
-        )
-        .join(Product, Product.client_id == Client.id)
-        .where(Product.status_id == 2)
-        .group_by(Client.id, Client.code)
-        .order_by(Client.id)
-    )
-
-    result = await session.execute(stmt)
-    rows = result.all()
+    # Балансы ведутся инкрементально (client_balances), отчёт — чтение готовых строк
+    rows = await CounterService.get_balances(session)
 
     return [
         {
             "client_id": row.client_id,
             "code": row.numeric_code,
-            "product_count": row.product_count,
-            "total_product_price": row.total_product_price
+            "product_count": row.pending_count,
+            "total_product_price": row.pending_amount
         }
         for row in rows
-    ]
\ No newline at end of file
+    ]
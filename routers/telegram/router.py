@@ -9,16 +9,18 @@ from config.database import get_async_session
 from models.user import User
 from models.client import Client
 from typing import List, Optional
-import shutil
 import os
 import httpx
 
-from schemas.telegram import TelegramMessage
-from tasks.telegram.send_message import send_notification_telegram, send_send_notification_telegram_photo
-from media import MEDIA_DIR
+from schemas.telegram import TelegramMessage, NotificationTaskResponse
+from services.notification import NotificationTaskService
+from services.media import MediaStore
+from services.image import ImageError, ImageVariants
 
 router = APIRouter(prefix="/telegram", tags=["telegram"])
 
+BROADCAST_IMAGE_SIZE = "large"
+
 # Существующий поиск клиентов (без изменений)
 @router.get("/clients/search")
 async def search_clients(
@@ -55,8 +57,11 @@ async def send_notification_without_photo(
     db: AsyncSession = Depends(get_async_session),
     user: User = Depends(fastapi_users.current_user(verified=True))
 ):
-    background_tasks.add_task(send_notification_telegram, telegram_message.message_text, telegram_message.telegram_chat_ids)
-    return {"message": "Сообщение отправлено"}
+    # Рассылка сохраняется в notification_tasks и отправляется планировщиком постранично
+    task = await NotificationTaskService.create(
+        db, telegram_message.message_text, telegram_message.telegram_chat_ids
+    )
+    return {"message": "Сообщение отправлено", "task_id": task.id, "total_recipients": task.total_recipients}
 
 
 @router.post("/send-photo")
@@ -65,7 +70,8 @@ async def send_notification_with_photo(
     background_tasks: BackgroundTasks,
     message_text: str = Form(...),
     telegram_chat_ids: Optional[str] = Form(None),
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_async_session),
 ):
     # Конвертируем строку "123,456,789" в список [123, 456, 789]
     chat_ids = [int(i) for i in telegram_chat_ids.split(",")] if telegram_chat_ids else []
@@ -75,23 +81,48 @@ async def send_notification_with_photo(
 
     try:
         for file in files:
-            file_path = os.path.join(MEDIA_DIR, file.filename)
-            
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            full_url = f"{request.base_url}media/{file.filename}"
+            # Файл сохраняется под именем по хэшу содержимого: одинаковые картинки не дублируются
+            name = await MediaStore.save_upload(file)
+            try:
+                # Боту отдаётся уменьшенная копия, а не оригинал с телефона
+                await ImageVariants.get(name, BROADCAST_IMAGE_SIZE)
+                full_url = ImageVariants.signed_url(str(request.base_url), name, BROADCAST_IMAGE_SIZE)
+            except ImageError:
+                full_url = f"{request.base_url}media/{name}"
             uploaded_files.append(full_url)
     except Exception as e:
         return {"error": str(e)}
     finally:
         for file in files:
-            file.file.close()
+            await file.close()
 
-    background_tasks.add_task(
-        send_send_notification_telegram_photo, 
-        message_text, 
-        chat_ids, 
-        uploaded_files
-    )
-    return {"message": "Сообщение отправлено"}
+    task = await NotificationTaskService.create(db, message_text, chat_ids, images=uploaded_files)
+    return {"message": "Сообщение отправлено", "task_id": task.id, "total_recipients": task.total_recipients}
+
+
+@router.get("/broadcasts", response_model=List[NotificationTaskResponse])
+async def get_broadcasts(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(fastapi_users.current_user(verified=True))
+):
+    return await NotificationTaskService.get_tasks(db, limit=limit)
+
+
+# Прогресс доставки рассылки
+@router.get("/broadcasts/{task_id}")
+async def get_broadcast(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(fastapi_users.current_user(verified=True))
+):
+    return await NotificationTaskService.get_progress(db, task_id)
+
+
+@router.post("/broadcasts/{task_id}/cancel", response_model=NotificationTaskResponse)
+async def cancel_broadcast(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_session),
+    user: User = Depends(fastapi_users.current_user(verified=True))
+):
+    return await NotificationTaskService.cancel(db, task_id)
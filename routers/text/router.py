@@ -6,12 +6,15 @@ from auth.fastapi_users_instance import fastapi_users
 from config.database import get_async_session
 from services.text import TextServices
 from schemas.text import TextBase, TextCreate, TextUpdate, TextResponse
+from fastapi_cache.decorator import cache
+from config.cache import CacheTag
 
 from models import User
 
 router = APIRouter(prefix="/textes", tags=["textes"])
 
 @router.get("/", response_model=List[TextResponse])
+@cache(namespace=CacheTag.TEXTES)
 async def textes_all(
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(fastapi_users.current_user(verified=True))
@@ -20,6 +23,7 @@ async def textes_all(
     return textes
 
 @router.get("/{text_id}", response_model=TextResponse)
+@cache(namespace=CacheTag.TEXTES)
 async def text_by_id(
     text_id: int,
     session: AsyncSession = Depends(get_async_session),
@@ -29,6 +33,7 @@ async def text_by_id(
     return text
 
 @router.get("/{key}", response_model=TextResponse)
+@cache(namespace=CacheTag.TEXTES)
 async def text_by_key(
     key: int,
     session: AsyncSession = Depends(get_async_session),
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from auth.fastapi_users_instance import fastapi_users
-from auth.auth import auth_backend
+from auth.auth import auth_backend, claims_auth_backend
+from config.config import JWT_CLAIMS_ENABLED
 from schemas.user import UserRead, UserCreate, UserUpdate
 from services.user import UserService
 from config.database import get_async_session
@@ -21,6 +22,13 @@ router.include_router(
     tags=["auth"],
 )
 
+if JWT_CLAIMS_ENABLED:
+    router.include_router(
+        fastapi_users.get_auth_router(claims_auth_backend),
+        prefix="/auth/jwt-claims",
+        tags=["auth"],
+    )
+
 router.include_router(
     fastapi_users.get_register_router(UserRead, UserCreate),
     prefix="/auth",
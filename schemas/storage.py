@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class PresignUploadRequest(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    size: Optional[int] = Field(None, ge=0, description="Размер файла в байтах; большие файлы загружаются частями")
+
+
+class MultipartPart(BaseModel):
+    ETag: str
+    PartNumber: int = Field(..., ge=1, le=10000)
+
+
+class MultipartCompleteRequest(BaseModel):
+    key: str
+    upload_id: str
+    parts: List[MultipartPart]
+
+
+class MultipartAbortRequest(BaseModel):
+    key: str
+    upload_id: str
+
+
+class UploadConfirmRequest(BaseModel):
+    key: str
+    content_type: Optional[str] = None
+
+
+class DocumentRead(BaseModel):
+    id: int
+    key: str
+    name: str
+    content_type: Optional[str] = None
+    created_at: datetime
+    url: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,6 +1,21 @@
-from typing import List
-from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
 
 class TelegramMessage(BaseModel):
     message_text: str
-    telegram_chat_ids: List[int] = None
\ No newline at end of file
+    telegram_chat_ids: List[int] = None
+
+class NotificationTaskResponse(BaseModel):
+    id: int
+    message: str
+    status: str
+    total_recipients: int
+    sent_count: int
+    failed_count: int
+    error_message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
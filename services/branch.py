@@ -2,6 +2,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.branch import BranchCreate, BranchUpdate
 from models import Branch
 from sqlalchemy.future import select
+from config.cache import CacheTag, invalidate
+from auth.user_cache import UserCache
 
 class BranchService:
     @staticmethod
@@ -9,6 +11,7 @@ class BranchService:
         db_branch = Branch(**branch_data.dict())
         db.add(db_branch)
         await db.commit()
+        await invalidate(CacheTag.BRANCHES)
         await db.refresh(db_branch)
         return db_branch
 
@@ -33,6 +36,8 @@ class BranchService:
             setattr(db_branch, key, value)
             
         await db.commit()
+        await invalidate(CacheTag.BRANCHES)
+        UserCache.clear()
         await db.refresh(db_branch)
         return db_branch
 
@@ -44,4 +49,6 @@ class BranchService:
         
         await db.delete(db_branch)
         await db.commit()
+        await invalidate(CacheTag.BRANCHES)
+        UserCache.clear()
         return db_branch
\ No newline at end of file
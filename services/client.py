@@ -2,10 +2,11 @@
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import desc, func as sql_func
-from models import Client, Branch
+from sqlalchemy import delete, desc, func as sql_func
+from models import Client, Branch, ClientBalance
 from schemas.client import ClientCreate, ClientUpdate
 from typing import Optional, List
+from services.counter import CounterDelta
 
 class ClientService:
     @staticmethod
@@ -37,6 +38,11 @@ class ClientService:
                 db_client.code = f"{branch.code}{db_client.numeric_code}"
         
         db.add(db_client)
+
+        counters = CounterDelta()
+        counters.add_client(db_client.branch_id)
+        await counters.flush(db)
+
         await db.commit()
         await db.refresh(db_client)
         return db_client
@@ -101,6 +107,7 @@ class ClientService:
         if not db_client:
             return None
         
+        old_branch_id = db_client.branch_id
         update_data = client_data.dict(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_client, key, value)
@@ -115,6 +122,12 @@ class ClientService:
                 db_client.code = f"{branch.code}{db_client.numeric_code}" if branch else None
             else:
                 db_client.code = None
+
+            if old_branch_id != db_client.branch_id:
+                counters = CounterDelta()
+                counters.remove_client(old_branch_id)
+                counters.add_client(db_client.branch_id)
+                await counters.flush(db)
         
         await db.commit()
         await db.refresh(db_client)
@@ -126,6 +139,12 @@ class ClientService:
         if not db_client:
             return None
         
+        counters = CounterDelta()
+        counters.remove_client(db_client.branch_id)
+        await counters.flush(db)
+        # Товары клиента остаются без клиента, поэтому его баланс больше не нужен
+        await db.execute(delete(ClientBalance).where(ClientBalance.client_id == db_client.id))
+
         await db.delete(db_client)
         await db.commit()
         return db_client
\ No newline at end of file
@@ -0,0 +1,289 @@
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.statuses import BaseStatus
+from models import Product, Client, Status
+from models.counter import ProductCounter, ClientCounter, ClientBalance, NO_KEY
+from services.status import StatusService
+
+
+def _key(value: Optional[int]) -> int:
+    return value if value is not None else NO_KEY
+
+
+def _decimal(value) -> Decimal:
+    # Вес и цена из Excel приходят числами с плавающей точкой или строками
+    return Decimal(str(value)) if value not in (None, "") else Decimal(0)
+
+
+class CounterDelta:
+    """
+    Накопитель изменений счётчиков в рамках одной транзакции.
+
+    Пути записи (загрузка файлов, смена статуса, выдача, удаление) копят
+    изменения через add/remove/move и вызывают flush перед commit —
+    в базу уходит один upsert на таблицу, независимо от числа товаров.
+    """
+
+    def __init__(self):
+        self.products: Dict[Tuple[int, int], int] = defaultdict(int)
+        self.clients: Dict[int, int] = defaultdict(int)
+        # (client_id, status_id) -> [количество, сумма, вес]; в баланс при flush попадает только BISHKEK
+        self.balances: Dict[Tuple[int, int], list] = defaultdict(lambda: [0, 0, Decimal(0)])
+
+    def add(self, status_id: Optional[int], branch_id: Optional[int], n: int = 1) -> None:
+        self.products[(_key(status_id), _key(branch_id))] += n
+
+    def remove(self, status_id: Optional[int], branch_id: Optional[int], n: int = 1) -> None:
+        self.products[(_key(status_id), _key(branch_id))] -= n
+
+    def move(
+        self,
+        old_status_id: Optional[int],
+        old_branch_id: Optional[int],
+        new_status_id: Optional[int],
+        new_branch_id: Optional[int],
+        n: int = 1,
+    ) -> None:
+        if _key(old_status_id) == _key(new_status_id) and _key(old_branch_id) == _key(new_branch_id):
+            return
+        self.remove(old_status_id, old_branch_id, n)
+        self.add(new_status_id, new_branch_id, n)
+
+    def remove_rows(self, rows: Iterable[Tuple[Optional[int], Optional[int]]]) -> None:
+        """Учесть удалённые строки (например, из DELETE ... RETURNING status_id, branch_id)."""
+        for status_id, branch_id in rows:
+            self.remove(status_id, branch_id)
+
+    def _balance(self, client_id: Optional[int], status_id: Optional[int], price, weight, sign: int) -> None:
+        if client_id is None or status_id is None:
+            return
+        balance = self.balances[(client_id, status_id)]
+        balance[0] += sign
+        # Integer-колонка price округляется в Postgres до ближайшего, половина — от нуля
+        balance[1] += sign * int(_decimal(price).to_integral_value(ROUND_HALF_UP))
+        balance[2] += sign * _decimal(weight)
+
+    def add_balance(self, client_id: Optional[int], status_id: Optional[int], price, weight) -> None:
+        """Учесть товар в балансе клиента; при flush учитываются только товары в статусе BISHKEK."""
+        self._balance(client_id, status_id, price, weight, 1)
+
+    def remove_balance(self, client_id: Optional[int], status_id: Optional[int], price, weight) -> None:
+        self._balance(client_id, status_id, price, weight, -1)
+
+    def add_client(self, branch_id: Optional[int], n: int = 1) -> None:
+        self.clients[_key(branch_id)] += n
+
+    def remove_client(self, branch_id: Optional[int], n: int = 1) -> None:
+        self.clients[_key(branch_id)] -= n
+
+    async def flush(self, db: AsyncSession) -> None:
+        product_rows = [
+            {"status_id": status_id, "branch_id": branch_id, "count": n}
+            for (status_id, branch_id), n in self.products.items() if n
+        ]
+        if product_rows:
+            stmt = pg_insert(ProductCounter).values(product_rows)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[ProductCounter.status_id, ProductCounter.branch_id],
+                    set_={"count": ProductCounter.count + stmt.excluded.count, "updated_at": func.now()},
+                )
+            )
+
+        client_rows = [
+            {"branch_id": branch_id, "count": n}
+            for branch_id, n in self.clients.items() if n
+        ]
+        if client_rows:
+            stmt = pg_insert(ClientCounter).values(client_rows)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[ClientCounter.branch_id],
+                    set_={"count": ClientCounter.count + stmt.excluded.count, "updated_at": func.now()},
+                )
+            )
+
+        # id статуса BISHKEK — по имени, тот же, что у /take и пересчёта
+        bishkek_id = await StatusService.get_id(db, BaseStatus.BISHKEK) if self.balances else None
+        # Строки в порядке client_id: параллельные транзакции блокируют их в одном порядке
+        balance_rows = [
+            {
+                "client_id": client_id,
+                "pending_count": count,
+                "pending_amount": amount,
+                "pending_weight": weight,
+            }
+            for (client_id, status_id), (count, amount, weight) in sorted(self.balances.items())
+            if status_id == bishkek_id and (count or amount or weight)
+        ]
+        if balance_rows:
+            stmt = pg_insert(ClientBalance).values(balance_rows)
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[ClientBalance.client_id],
+                    set_={
+                        "pending_count": ClientBalance.pending_count + stmt.excluded.pending_count,
+                        "pending_amount": ClientBalance.pending_amount + stmt.excluded.pending_amount,
+                        "pending_weight": ClientBalance.pending_weight + stmt.excluded.pending_weight,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+
+        self.products.clear()
+        self.clients.clear()
+        self.balances.clear()
+
+
+async def _snapshot(db: AsyncSession, keys: list, values: list) -> dict:
+    result = await db.execute(select(*keys, *values))
+    return {tuple(row[:len(keys)]): tuple(row[len(keys):]) for row in result.all()}
+
+
+_RECONCILED = [
+    ([ProductCounter.status_id, ProductCounter.branch_id], [ProductCounter.count]),
+    ([ClientCounter.branch_id], [ClientCounter.count]),
+    (
+        [ClientBalance.client_id],
+        [ClientBalance.pending_count, ClientBalance.pending_amount, ClientBalance.pending_weight],
+    ),
+]
+
+
+class CounterService:
+    @staticmethod
+    async def get_summary(db: AsyncSession, user_branches: List[int]) -> dict:
+        """Сводка для дашборда из таблиц счётчиков (пустой user_branches — все филиалы)."""
+        products_query = (
+            select(ProductCounter.status_id, func.sum(ProductCounter.count).label("count"))
+            .group_by(ProductCounter.status_id)
+        )
+        clients_query = select(func.coalesce(func.sum(ClientCounter.count), 0))
+        if user_branches:
+            products_query = products_query.where(ProductCounter.branch_id.in_(user_branches))
+            clients_query = clients_query.where(ClientCounter.branch_id.in_(user_branches))
+
+        status_counts = dict((await db.execute(products_query)).all())
+        total_clients = (await db.execute(clients_query)).scalar() or 0
+
+        statuses = (await db.execute(select(Status))).scalars().all()
+        products_by_status = {
+            status.name: int(status_counts.get(status.id, 0)) for status in statuses
+        }
+
+        return {
+            "total_clients": int(total_clients),
+            "total_products": int(sum(status_counts.values())),
+            "products_by_status": products_by_status,
+        }
+
+    @staticmethod
+    async def reconcile(db: AsyncSession) -> dict:
+        """
+        Пересчитывает счётчики и балансы клиентов с нуля по таблицам products и clients.
+
+        Таблицы счётчиков блокируются до пересчёта, поэтому параллельные
+        транзакции либо уже закоммичены и попадут в агрегат, либо дождутся
+        окончания пересчёта и применят свою дельту поверх него.
+        corrected_rows — число строк счётчиков, значение которых изменилось (дрейф).
+        """
+        await db.execute(text(
+            "LOCK TABLE product_counters, client_counters, client_balances IN SHARE ROW EXCLUSIVE MODE"
+        ))
+        before = [await _snapshot(db, keys, values) for keys, values in _RECONCILED]
+
+        await db.execute(delete(ProductCounter))
+        await db.execute(
+            insert(ProductCounter).from_select(
+                ["status_id", "branch_id", "count"],
+                select(
+                    func.coalesce(Product.status_id, NO_KEY),
+                    func.coalesce(Product.branch_id, NO_KEY),
+                    func.count(Product.id),
+                ).group_by(
+                    func.coalesce(Product.status_id, NO_KEY),
+                    func.coalesce(Product.branch_id, NO_KEY),
+                ),
+            )
+        )
+
+        await db.execute(delete(ClientCounter))
+        await db.execute(
+            insert(ClientCounter).from_select(
+                ["branch_id", "count"],
+                select(
+                    func.coalesce(Client.branch_id, NO_KEY),
+                    func.count(Client.id),
+                ).group_by(func.coalesce(Client.branch_id, NO_KEY)),
+            )
+        )
+
+        await db.execute(delete(ClientBalance))
+        bishkek_id = await StatusService.get_id(db, BaseStatus.BISHKEK)
+        if bishkek_id is not None:
+            await db.execute(
+                insert(ClientBalance).from_select(
+                    ["client_id", "pending_count", "pending_amount", "pending_weight"],
+                    select(
+                        Product.client_id,
+                        func.count(Product.id),
+                        func.coalesce(func.sum(Product.price), 0),
+                        func.coalesce(func.sum(Product.weight), 0),
+                    )
+                    .where(Product.status_id == bishkek_id, Product.client_id.isnot(None))
+                    .group_by(Product.client_id),
+                )
+            )
+
+        after = [await _snapshot(db, keys, values) for keys, values in _RECONCILED]
+        corrected = sum(
+            1
+            for old, new in zip(before, after)
+            for key in old.keys() | new.keys()
+            if old.get(key) != new.get(key)
+        )
+        await db.commit()
+
+        products_total = (await db.execute(select(func.coalesce(func.sum(ProductCounter.count), 0)))).scalar()
+        clients_total = (await db.execute(select(func.coalesce(func.sum(ClientCounter.count), 0)))).scalar()
+        pending_total = (await db.execute(select(func.coalesce(func.sum(ClientBalance.pending_count), 0)))).scalar()
+        return {
+            "total_products": int(products_total),
+            "total_clients": int(clients_total),
+            "pending_products": int(pending_total),
+            "corrected_rows": corrected,
+        }
+
+    @staticmethod
+    async def get_client_balance(db: AsyncSession, client_id: int) -> dict:
+        """Товары клиента, ожидающие выдачи: одна строка client_balances по ключу."""
+        result = await db.execute(select(ClientBalance).where(ClientBalance.client_id == client_id))
+        balance = result.scalars().first()
+        return {
+            "client_id": client_id,
+            "product_count": balance.pending_count if balance else 0,
+            "total_product_price": balance.pending_amount if balance else 0,
+            "total_weight": balance.pending_weight if balance else Decimal(0),
+        }
+
+    @staticmethod
+    async def get_balances(db: AsyncSession) -> list:
+        """Клиенты с товарами, ожидающими выдачи, в порядке client_id."""
+        result = await db.execute(
+            select(
+                ClientBalance.client_id,
+                Client.numeric_code,
+                ClientBalance.pending_count,
+                ClientBalance.pending_amount,
+                ClientBalance.pending_weight,
+            )
+            .join(Client, Client.id == ClientBalance.client_id)
+            .where(ClientBalance.pending_count > 0)
+            .order_by(ClientBalance.client_id)
+        )
+        return result.all()
@@ -0,0 +1,30 @@
+import os
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.document import Document
+
+
+def document_name(key: str) -> str:
+    """Исходное имя файла из ключа <folder>/<uuid>_<name>."""
+    name = os.path.basename(key)
+    prefix, _, original = name.partition("_")
+    return original if prefix and original else name
+
+
+class DocumentService:
+    @staticmethod
+    async def record(
+        db: AsyncSession, key: str, content_type: Optional[str], uploaded_by_id: Optional[UUID]
+    ) -> Document:
+        """Записывает ключ загруженного объекта; повторное подтверждение возвращает существующую запись."""
+        await db.execute(
+            pg_insert(Document)
+            .values(key=key, name=document_name(key), content_type=content_type, uploaded_by_id=uploaded_by_id)
+            .on_conflict_do_nothing(index_elements=[Document.key])
+        )
+        await db.commit()
+        result = await db.execute(select(Document).where(Document.key == key))
+        return result.scalars().one()
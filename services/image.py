@@ -0,0 +1,122 @@
+import asyncio
+import os
+import uuid
+from typing import Dict
+from urllib.parse import urlencode
+import aiofiles.os
+import anyio
+import pyvips
+
+from media import MEDIA_DIR, CONTENT_ADDRESSED
+from services.media import media_path
+from services.storage import media_storage
+
+# Максимальная сторона варианта в пикселях
+SIZES = {
+    "thumb": 320,
+    "medium": 800,
+    "large": 1600,
+}
+FORMATS = {
+    "jpeg": {"suffix": ".jpg", "options": {"Q": 82, "strip": True, "optimize_coding": True, "interlace": True}},
+    "webp": {"suffix": ".webp", "options": {"Q": 80, "strip": True}},
+}
+
+VARIANTS_DIR = os.path.join(MEDIA_DIR, "variants")
+
+# Срок подписанной ссылки на вариант: бот забирает картинки рассылки, пока она идёт
+IMAGE_LINK_EXPIRES = 7 * 24 * 60 * 60
+
+# Обработка идёт в пуле потоков; не больше IMAGE_WORKERS изображений одновременно
+IMAGE_WORKERS = 4
+_limiter = anyio.CapacityLimiter(IMAGE_WORKERS)
+
+# Одновременные запросы одного варианта ждут одну генерацию
+_in_progress: Dict[str, asyncio.Future] = {}
+
+
+class ImageError(Exception):
+    """Файл не найден или не является изображением."""
+
+
+def variant_name(name: str, size: str, fmt: str) -> str:
+    content_hash = os.path.splitext(os.path.basename(name))[0]
+    return f"{content_hash[:2]}/{content_hash}_{size}{FORMATS[fmt]['suffix']}"
+
+
+def _render(source: str, target: str, max_side: int, fmt: str) -> None:
+    # thumbnail уменьшает уже при декодировании (shrink-on-load) и не держит оригинал в памяти целиком;
+    # size="down" не увеличивает маленькие изображения
+    image = pyvips.Image.thumbnail(source, max_side, height=max_side, size="down")
+    tmp = f"{target}.{uuid.uuid4().hex}.tmp{FORMATS[fmt]['suffix']}"
+    try:
+        image.write_to_file(tmp, **FORMATS[fmt]["options"])
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _link_key(name: str, size: str) -> str:
+    return f"images/{size}/{name}"
+
+
+class ImageVariants:
+    @staticmethod
+    def signed_url(base_url: str, name: str, size: str, expires_in: int = IMAGE_LINK_EXPIRES) -> str:
+        """Ссылка на вариант без авторизации (для бота): подпись проверяется в /images."""
+        params = media_storage.sign(_link_key(name, size), "GET", expires_in)
+        return f"{base_url.rstrip('/')}/images/{size}/{name}?{urlencode(params)}"
+
+    @staticmethod
+    def media_url(base_url: str, name: str, size: str, fmt: str = "jpeg") -> str:
+        """
+        Постоянная публичная ссылка на уже построенный вариант через /media
+        (варианты лежат в MEDIA_DIR/variants). Для <img src> и бота без токена.
+        """
+        path = os.path.relpath(os.path.join(VARIANTS_DIR, variant_name(name, size, fmt)), MEDIA_DIR)
+        return f"{base_url.rstrip('/')}/media/{path.replace(os.sep, '/')}"
+
+    @staticmethod
+    def verify_link(name: str, size: str, expires: int, signature: str) -> bool:
+        return media_storage.verify(_link_key(name, size), "GET", expires, signature)
+
+    @staticmethod
+    async def get(name: str, size: str, fmt: str = "jpeg") -> str:
+        """
+        Путь к варианту изображения из медиа-хранилища (name — <hash[:2]>/<hash><ext>).
+
+        Вариант строится один раз и хранится в MEDIA_DIR/variants по хэшу
+        содержимого и размеру, поэтому повторные запросы отдают готовый файл.
+        """
+        if size not in SIZES or fmt not in FORMATS:
+            raise ImageError("Неизвестный размер или формат")
+        if not CONTENT_ADDRESSED.match(name):
+            raise ImageError("Файл не найден")
+
+        source = media_path(name)
+        target = os.path.join(VARIANTS_DIR, variant_name(name, size, fmt))
+        if await aiofiles.os.path.exists(target):
+            return target
+        if not await aiofiles.os.path.exists(source):
+            raise ImageError("Файл не найден")
+
+        future = _in_progress.get(target)
+        if future is not None:
+            await future
+            return target
+
+        future = asyncio.get_running_loop().create_future()
+        _in_progress[target] = future
+        try:
+            await aiofiles.os.makedirs(os.path.dirname(target), exist_ok=True)
+            await anyio.to_thread.run_sync(_render, source, target, SIZES[size], fmt, limiter=_limiter)
+            future.set_result(target)
+        except pyvips.Error as e:
+            future.set_exception(ImageError(f"Не удалось обработать изображение: {e}"))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            del _in_progress[target]
+        # Ошибка пробрасывается всем ожидающим, в том числе текущему вызову
+        return await future
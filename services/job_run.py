@@ -0,0 +1,32 @@
+from typing import List, Optional
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.job_run import JobRun
+
+
+class JobRunService:
+    @staticmethod
+    async def get_runs(
+        db: AsyncSession,
+        job_name: Optional[str] = None,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[JobRun]:
+        query = select(JobRun).order_by(desc(JobRun.started_at))
+        if job_name:
+            query = query.filter(JobRun.job_name == job_name)
+        if status:
+            query = query.filter(JobRun.status == status)
+        result = await db.execute(query.offset(skip).limit(limit))
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_last_success(db: AsyncSession, job_name: str) -> Optional[JobRun]:
+        result = await db.execute(
+            select(JobRun)
+            .filter(JobRun.job_name == job_name, JobRun.status == "success")
+            .order_by(desc(JobRun.started_at))
+            .limit(1)
+        )
+        return result.scalars().first()
@@ -0,0 +1,41 @@
+import hashlib
+import os
+import re
+from fastapi import UploadFile
+
+from services.storage import media_storage
+
+CHUNK_SIZE = 1024 * 1024
+
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+
+def _extension(filename: str) -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension if _EXTENSION.match(extension) else ""
+
+
+def media_path(name: str) -> str:
+    """Абсолютный путь к файлу по его имени в хранилище (<hash[:2]>/<hash><ext>)."""
+    return media_storage.path(name)
+
+
+class MediaStore:
+    @staticmethod
+    async def save_upload(file: UploadFile) -> str:
+        """
+        Сохраняет загрузку под именем по sha256 содержимого и возвращает путь
+        относительно MEDIA_DIR. Файл читается и пишется порциями без блокировки
+        цикла событий; одинаковое содержимое хранится один раз.
+        """
+        # UploadFile уже лежит во временном файле: сначала считаем хэш, потом сохраняем, если такого ещё нет
+        digest = hashlib.sha256()
+        while chunk := await file.read(CHUNK_SIZE):
+            digest.update(chunk)
+        await file.seek(0)
+
+        content_hash = digest.hexdigest()
+        name = f"{content_hash[:2]}/{content_hash}{_extension(file.filename)}"
+        if not await media_storage.exists(name):
+            await media_storage.put(name, file.read)
+        return name
@@ -0,0 +1,219 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import ARRAY, String, bindparam, case, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Client, NotificationTask, NotificationImage, notification_task_recipients as recipients
+
+# После стольких временных ошибок получатель помечается недоставленным
+MAX_RECIPIENT_ATTEMPTS = 5
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+class NotificationTaskService:
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        message: str,
+        telegram_chat_ids: Optional[List[int]] = None,
+        images: Optional[List[str]] = None,
+    ) -> NotificationTask:
+        """
+        Создаёт рассылку. Получатели вставляются одним INSERT ... SELECT:
+        все клиенты с telegram_chat_id или переданные chat id. Переданный chat id
+        попадает в рассылку и без клиента — тогда client_id пустой.
+        """
+        task = NotificationTask(message=message, status="pending")
+        db.add(task)
+        await db.flush()
+
+        for image in images or []:
+            db.add(NotificationImage(task_id=task.id, image=image))
+
+        columns = ["notification_task_id", "telegram_chat_id", "client_id"]
+        if telegram_chat_ids:
+            chat_ids = bindparam(
+                "chat_ids",
+                value=list({str(chat_id) for chat_id in telegram_chat_ids if str(chat_id).strip()}),
+                type_=ARRAY(String),
+            )
+            chats = func.unnest(chat_ids).table_valued("chat_id").render_derived(name="chats")
+            # У нескольких клиентов может быть один chat id: сообщение уходит один раз
+            query = (
+                select(literal(task.id), chats.c.chat_id, func.min(Client.id))
+                .select_from(chats)
+                .join(Client, Client.telegram_chat_id == chats.c.chat_id, isouter=True)
+                .group_by(chats.c.chat_id)
+            )
+        else:
+            query = (
+                select(literal(task.id), Client.telegram_chat_id, func.min(Client.id))
+                .where(Client.telegram_chat_id.is_not(None), Client.telegram_chat_id != "")
+                .group_by(Client.telegram_chat_id)
+            )
+        result = await db.execute(insert(recipients).from_select(columns, query))
+        task.total_recipients = result.rowcount
+        if not task.total_recipients:
+            task.status = "done"
+            task.finished_at = datetime.utcnow()
+
+        await db.commit()
+        await db.refresh(task)
+        return task
+
+    @staticmethod
+    async def get_progress(db: AsyncSession, task_id: int) -> dict:
+        task = await db.get(NotificationTask, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Рассылка не найдена")
+
+        result = await db.execute(
+            select(recipients.c.status, func.count())
+            .where(recipients.c.notification_task_id == task_id)
+            .group_by(recipients.c.status)
+        )
+        by_status = dict(result.all())
+        done = by_status.get("sent", 0) + by_status.get("failed", 0)
+        return {
+            "id": task.id,
+            "message": task.message,
+            "status": task.status,
+            "error_message": task.error_message,
+            "total_recipients": task.total_recipients,
+            "pending": by_status.get("pending", 0),
+            "sent": by_status.get("sent", 0),
+            "failed": by_status.get("failed", 0),
+            "progress": round(done / task.total_recipients * 100, 1) if task.total_recipients else 100.0,
+            "created_at": task.created_at,
+            "started_at": task.started_at,
+            "finished_at": task.finished_at,
+        }
+
+    @staticmethod
+    async def get_tasks(db: AsyncSession, limit: int = 50) -> List[NotificationTask]:
+        result = await db.execute(select(NotificationTask).order_by(NotificationTask.id.desc()).limit(limit))
+        return result.scalars().all()
+
+    @staticmethod
+    async def cancel(db: AsyncSession, task_id: int) -> NotificationTask:
+        task = await db.get(NotificationTask, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Рассылка не найдена")
+        if task.status not in ACTIVE_STATUSES:
+            raise HTTPException(status_code=400, detail="Рассылка уже завершена")
+        task.status = "cancelled"
+        task.finished_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(task)
+        return task
+
+    @staticmethod
+    async def get_active_ids(db: AsyncSession) -> List[int]:
+        result = await db.execute(
+            select(NotificationTask.id)
+            .where(NotificationTask.status.in_(ACTIVE_STATUSES))
+            .order_by(NotificationTask.id)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def start(db: AsyncSession, task_id: int) -> Optional[NotificationTask]:
+        """Переводит рассылку в 'running'; None, если она отменена или завершена."""
+        task = await db.get(NotificationTask, task_id, with_for_update=True)
+        if not task or task.status not in ACTIVE_STATUSES:
+            return None
+        if task.status == "pending":
+            task.status = "running"
+            task.started_at = datetime.utcnow()
+        return task
+
+    @staticmethod
+    async def get_images(db: AsyncSession, task_id: int) -> List[str]:
+        result = await db.execute(
+            select(NotificationImage.image).where(NotificationImage.task_id == task_id).order_by(NotificationImage.id)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def claim_page(db: AsyncSession, task_id: int, page_size: int) -> list:
+        """
+        Следующая страница недоставленных получателей (client_id, telegram_chat_id, code, name).
+        Для chat id без клиента client_id, code и name пустые.
+
+        Строки блокируются до конца транзакции, SKIP LOCKED позволяет
+        нескольким воркерам разбирать одну рассылку параллельно.
+        """
+        result = await db.execute(
+            select(recipients.c.client_id, recipients.c.telegram_chat_id, Client.code, Client.name)
+            .join(Client, Client.id == recipients.c.client_id, isouter=True)
+            .where(recipients.c.notification_task_id == task_id, recipients.c.status == "pending")
+            .order_by(recipients.c.telegram_chat_id)
+            .limit(page_size)
+            .with_for_update(of=recipients, skip_locked=True)
+        )
+        return result.all()
+
+    @staticmethod
+    async def mark_page(
+        db: AsyncSession, task_id: int, chat_ids: List[str], status: str, error: Optional[str] = None
+    ) -> None:
+        """Помечает страницу отправленной ('sent') или недоставленной ('failed') и обновляет счётчики рассылки."""
+        await db.execute(
+            update(recipients)
+            .where(recipients.c.notification_task_id == task_id, recipients.c.telegram_chat_id.in_(chat_ids))
+            .values(
+                status=status,
+                attempts=recipients.c.attempts + 1,
+                sent_at=func.now() if status == "sent" else None,
+                error=error[:2000] if error else None,
+            )
+        )
+        counter = NotificationTask.sent_count if status == "sent" else NotificationTask.failed_count
+        await db.execute(
+            update(NotificationTask)
+            .where(NotificationTask.id == task_id)
+            .values({counter: counter + len(chat_ids)})
+        )
+
+    @staticmethod
+    async def defer_page(db: AsyncSession, task_id: int, chat_ids: List[str], error: str) -> None:
+        """
+        Временная ошибка: получатели остаются в очереди, а исчерпавшие
+        MAX_RECIPIENT_ATTEMPTS попыток помечаются недоставленными.
+        """
+        result = await db.execute(
+            update(recipients)
+            .where(recipients.c.notification_task_id == task_id, recipients.c.telegram_chat_id.in_(chat_ids))
+            .values(
+                attempts=recipients.c.attempts + 1,
+                status=case((recipients.c.attempts + 1 >= MAX_RECIPIENT_ATTEMPTS, "failed"), else_="pending"),
+                error=error[:2000],
+            )
+            .returning(recipients.c.status)
+        )
+        exhausted = sum(1 for status in result.scalars() if status == "failed")
+        if exhausted:
+            await db.execute(
+                update(NotificationTask)
+                .where(NotificationTask.id == task_id)
+                .values(failed_count=NotificationTask.failed_count + exhausted)
+            )
+
+    @staticmethod
+    async def finish_if_done(db: AsyncSession, task_id: int) -> bool:
+        """Завершает рассылку, если недоставленных получателей не осталось."""
+        pending = await db.execute(
+            select(recipients.c.telegram_chat_id)
+            .where(recipients.c.notification_task_id == task_id, recipients.c.status == "pending")
+            .limit(1)
+        )
+        if pending.first() is not None:
+            return False
+        await db.execute(
+            update(NotificationTask)
+            .where(NotificationTask.id == task_id, NotificationTask.status.in_(ACTIVE_STATUSES))
+            .values(status="done", finished_at=func.now())
+        )
+        return True
@@ -0,0 +1,217 @@
+import random
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, List, Optional
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from config.config import NOTIFICATION_COALESCE_SECONDS, OUTBOX_LEASE_SECONDS
+from models.outbox import NotificationOutbox
+
+
+class OutboxKind:
+    CHINA = "china"
+    TRANSIT = "transit"
+    BISHKEK = "bishkek"
+
+
+# Повторные попытки: 30с, 1м, 2м, ... не чаще раза в час, после MAX_ATTEMPTS — 'failed'
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+MAX_ATTEMPTS = 10
+
+
+# Типы, у которых payload — {telegram_chat_id: count} и которые можно суммировать
+COALESCED_KINDS = (OutboxKind.CHINA, OutboxKind.TRANSIT, OutboxKind.BISHKEK)
+
+
+def merge_counts(*payloads: dict) -> dict:
+    """Суммирует количества по telegram_chat_id."""
+    merged = defaultdict(int)
+    for payload in payloads:
+        for chat_id, count in payload.items():
+            merged[str(chat_id)] += count
+    return dict(merged)
+
+
+class OutboxService:
+    @staticmethod
+    def enqueue(db: AsyncSession, kind: str, payload: Any) -> NotificationOutbox:
+        """
+        Добавляет уведомление в outbox. Фиксируется вместе с транзакцией вызывающей стороны.
+
+        Суммируемые уведомления откладываются на NOTIFICATION_COALESCE_SECONDS,
+        чтобы загрузки за это окно ушли клиенту одним сообщением.
+        """
+        message = NotificationOutbox(kind=kind, payload=payload, status="pending", attempts=0)
+        if kind in COALESCED_KINDS and NOTIFICATION_COALESCE_SECONDS > 0:
+            message.next_attempt_at = func.now() + timedelta(seconds=NOTIFICATION_COALESCE_SECONDS)
+        db.add(message)
+        return message
+
+    @staticmethod
+    async def claim_batch(db: AsyncSession, limit: int = 100) -> List[NotificationOutbox]:
+        """
+        Арендует готовые к отправке записи: статус 'sending' до locked_until.
+
+        Вызывающая сторона сразу коммитит аренду и отправляет вне транзакции.
+        SKIP LOCKED позволяет нескольким воркерам разбирать очередь параллельно;
+        записи, чья аренда истекла (воркер упал), забираются повторно.
+        """
+        ready = (
+            select(NotificationOutbox.id)
+            .where(
+                or_(
+                    and_(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= func.now()),
+                    and_(NotificationOutbox.status == "sending", NotificationOutbox.locked_until < func.now()),
+                )
+            )
+            .order_by(NotificationOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(ready.scalar_subquery()))
+            .values(status="sending", locked_until=func.now() + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+            .returning(NotificationOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        return sorted(result.scalars().all(), key=lambda message: message.id)
+
+    @staticmethod
+    async def release(db: AsyncSession, messages: List[NotificationOutbox]) -> None:
+        """Возвращает арендованные записи в очередь без траты попытки."""
+        if messages:
+            await db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_([message.id for message in messages]))
+                .values(status="pending", locked_until=None)
+            )
+
+    @staticmethod
+    async def coalesce(db: AsyncSession, messages: List[NotificationOutbox]) -> List[NotificationOutbox]:
+        """
+        Объединяет новые (ещё не отправлявшиеся) уведомления одного типа в одно.
+
+        Первая такая запись каждого типа становится основной: к ней добавляются
+        остальные захваченные записи этого типа и ожидающие записи, чьё окно
+        ещё не истекло. Их количества суммируются по (telegram_chat_id, тип),
+        а сами они получают статус 'merged'. Возвращает записи для отправки.
+        Коммит — на вызывающей стороне.
+        """
+        carriers = {}
+        absorbed = defaultdict(list)
+        result = []
+        for message in messages:
+            if message.kind not in COALESCED_KINDS or message.attempts > 0:
+                result.append(message)
+            elif message.kind not in carriers:
+                carriers[message.kind] = message
+                result.append(message)
+            else:
+                absorbed[message.kind].append(message)
+
+        claimed_ids = [message.id for message in messages]
+        for kind, carrier in carriers.items():
+            pending = await db.execute(
+                select(NotificationOutbox)
+                .where(
+                    NotificationOutbox.kind == kind,
+                    NotificationOutbox.status == "pending",
+                    NotificationOutbox.attempts == 0,
+                    NotificationOutbox.id.not_in(claimed_ids),
+                )
+                .order_by(NotificationOutbox.id)
+                .with_for_update(skip_locked=True)
+            )
+            absorbed[kind].extend(pending.scalars().all())
+            if not absorbed[kind]:
+                continue
+
+            carrier.payload = merge_counts(carrier.payload, *[message.payload for message in absorbed[kind]])
+            await db.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_([message.id for message in absorbed[kind]]))
+                .values(status="merged", merged_into_id=carrier.id, sent_at=func.now())
+            )
+        return result
+
+    @staticmethod
+    async def mark_sent(db: AsyncSession, message: NotificationOutbox, chunk_results: Optional[list] = None) -> None:
+        await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == message.id)
+            .values(
+                status="sent",
+                locked_until=None,
+                sent_at=func.now(),
+                attempts=NotificationOutbox.attempts + 1,
+                last_error=None,
+                chunk_results=chunk_results,
+            )
+        )
+
+    @staticmethod
+    async def mark_failed(
+        db: AsyncSession,
+        message: NotificationOutbox,
+        error: str,
+        payload: Optional[Any] = None,
+        chunk_results: Optional[list] = None,
+    ) -> None:
+        """
+        Планирует повтор; payload, если передан, заменяет исходный (например, только неотправленные получатели).
+        chunk_results — итог по порциям этой попытки.
+        """
+        attempts = message.attempts + 1
+        if attempts >= MAX_ATTEMPTS:
+            values = {"status": "failed"}
+        else:
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+            delay *= random.uniform(0.5, 1.5)
+            values = {"status": "pending", "next_attempt_at": func.now() + timedelta(seconds=delay)}
+        if payload is not None:
+            values["payload"] = payload
+        await db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id == message.id)
+            .values(attempts=attempts, locked_until=None, last_error=error[:2000], chunk_results=chunk_results, **values)
+        )
+
+    @staticmethod
+    async def purge_sent(db: AsyncSession, older_than: timedelta = timedelta(days=7)) -> int:
+        result = await db.execute(
+            delete(NotificationOutbox).where(
+                NotificationOutbox.status.in_(["sent", "merged"]),
+                NotificationOutbox.sent_at < func.now() - older_than,
+            )
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def get_stats(db: AsyncSession) -> dict:
+        """Глубина очереди и задержка (возраст самой старой неотправленной записи)."""
+        result = await db.execute(
+            select(
+                func.count().filter(NotificationOutbox.status == "pending").label("pending"),
+                func.count().filter(
+                    NotificationOutbox.status == "pending", NotificationOutbox.attempts > 0
+                ).label("retrying"),
+                func.count().filter(NotificationOutbox.status == "sending").label("sending"),
+                func.count().filter(NotificationOutbox.status == "failed").label("failed"),
+                func.extract(
+                    "epoch",
+                    func.now() - func.min(NotificationOutbox.created_at).filter(
+                        NotificationOutbox.status.in_(["pending", "sending"])
+                    ),
+                ).label("lag_seconds"),
+            ).where(NotificationOutbox.status.in_(["pending", "sending", "failed"]))
+        )
+        row = result.one()
+        return {
+            "pending": row.pending,
+            "retrying": row.retrying,
+            "sending": row.sending,
+            "failed": row.failed,
+            "lag_seconds": float(row.lag_seconds) if row.lag_seconds is not None else 0.0,
+        }
@@ -5,6 +5,7 @@ from models import PaymentMethod, Payment, Product
 from schemas.payment import PaymentMethodCreate, PaymentMethodUpdate, PaymentCreate, PaymentUpdate
 from typing import Optional, List
 from uuid import UUID
+from config.cache import CacheTag, invalidate
 
 class PaymentMethodService:
     @staticmethod
@@ -12,6 +13,7 @@ class PaymentMethodService:
         db_method = PaymentMethod(**method_data.dict())
         db.add(db_method)
         await db.commit()
+        await invalidate(CacheTag.PAYMENT_METHODS)
         await db.refresh(db_method)
         return db_method
 
@@ -40,6 +42,7 @@ class PaymentMethodService:
             setattr(db_method, key, value)
         
         await db.commit()
+        await invalidate(CacheTag.PAYMENT_METHODS)
         await db.refresh(db_method)
         return db_method
 
@@ -51,6 +54,7 @@ class PaymentMethodService:
         
         await db.delete(db_method)
         await db.commit()
+        await invalidate(CacheTag.PAYMENT_METHODS)
         return db_method
     
 
@@ -3,14 +3,16 @@ from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from config.statuses import BaseStatus
-from models import Product, Client, Status, ProductHistory
-from sqlalchemy import delete, func
+from models import Product, Client, Status, ProductHistory, payment_products
+from sqlalchemy import Integer, any_, bindparam, delete, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from schemas.product import ProductCreate, ProductUpdate
 from typing import Optional, List
 from datetime import date, datetime, timedelta, timezone
 from sqlalchemy.orm import selectinload
 
 from services.product_history import ProductHistoryManager
+from services.counter import CounterDelta
 
 class ProductService:
     @staticmethod
@@ -75,6 +77,11 @@ class ProductService:
                 client_code=client.code
             )
 
+            counters = CounterDelta()
+            counters.add(db_product.status_id, db_product.branch_id)
+            counters.add_balance(db_product.client_id, db_product.status_id, db_product.price, db_product.weight)
+            await counters.flush(db)
+
             await db.commit()
             await db.refresh(db_product)
             return db_product
@@ -249,6 +256,12 @@ class ProductService:
                 old_data=old_data,
                 new_data=new_data
             )
+
+            counters = CounterDelta()
+            counters.move(old_data["status_id"], old_data["branch_id"], db_product.status_id, db_product.branch_id)
+            counters.remove_balance(old_data["client_id"], old_data["status_id"], old_data["price"], old_data["weight"])
+            counters.add_balance(db_product.client_id, db_product.status_id, db_product.price, db_product.weight)
+            await counters.flush(db)
             
             await db.commit()
             await db.refresh(db_product)
@@ -267,6 +280,11 @@ class ProductService:
             delete(ProductHistory).where(ProductHistory.product_id == product_id)
         )
         
+        counters = CounterDelta()
+        counters.remove(db_product.status_id, db_product.branch_id)
+        counters.remove_balance(db_product.client_id, db_product.status_id, db_product.price, db_product.weight)
+        await counters.flush(db)
+
         await db.delete(db_product)
         await db.commit()
         return db_product
@@ -290,7 +308,12 @@ class ProductService:
             status_name = status.name
 
             # Обновляем статус товаров и создаем записи в ProductHistory
+            counters = CounterDelta()
             for product in products:
+                counters.move(product.status_id, product.branch_id, status_id, product.branch_id)
+                counters.remove_balance(product.client_id, product.status_id, product.price, product.weight)
+                counters.add_balance(product.client_id, status_id, product.price, product.weight)
+
                 # Сохраняем старые данные для истории
                 old_data = {
                     "status_id": product.status_id,
@@ -326,6 +349,7 @@ class ProductService:
                     new_data=new_data
                 )
 
+            await counters.flush(db)
             await db.commit()
 
             # Обновляем объекты для возврата
@@ -343,17 +367,38 @@ class ProductService:
 
     @staticmethod
     async def delete_products(db: AsyncSession, product_ids: List[int]) -> int:
-        query = select(Product).filter(Product.id.in_(product_ids))
-        result = await db.execute(query)
-        products = result.scalars().all()
+        # Один массив-параметр вместо IN (...) — не упираемся в лимит параметров asyncpg
+        ids = bindparam("ids", value=list(set(product_ids)), type_=ARRAY(Integer))
+        try:
+            # Сначала удаляем зависимые записи (история и связи с оплатами), затем сами товары
+            await db.execute(
+                delete(ProductHistory).where(ProductHistory.product_id == any_(ids))
+            )
+            await db.execute(
+                delete(payment_products).where(payment_products.c.product_id == any_(ids))
+            )
+            result = await db.execute(
+                delete(Product)
+                .where(Product.id == any_(ids))
+                .returning(Product.status_id, Product.branch_id, Product.client_id, Product.price, Product.weight)
+            )
+            deleted_rows = result.all()
+            deleted_count = len(deleted_rows)
 
-        if not products:
-            raise ValueError("Товары с указанными ID не найдены")
+            if not deleted_count:
+                await db.rollback()
+                raise ValueError("Товары с указанными ID не найдены")
 
-        deleted_count = 0
-        for product in products:
-            await db.delete(product)
-            deleted_count += 1
+            counters = CounterDelta()
+            counters.remove_rows((row.status_id, row.branch_id) for row in deleted_rows)
+            for row in deleted_rows:
+                counters.remove_balance(row.client_id, row.status_id, row.price, row.weight)
+            await counters.flush(db)
 
-        await db.commit()
-        return deleted_count
\ No newline at end of file
+            await db.commit()
+            return deleted_count
+        except ValueError:
+            raise
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(status_code=500, detail=f"Ошибка при удалении товаров: {str(e)}")
@@ -0,0 +1,223 @@
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import JSON, func, literal_column, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.statuses import BaseStatus
+from models import Product, Client, Status, PaymentMethod
+from models.counter import NO_KEY
+from services.rollup import RollupService
+
+
+def _json_list(expression, *order_by):
+    """json_agg с сортировкой; для пустой выборки возвращает []."""
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(expression, *order_by), type_=JSON),
+        literal_column("'[]'::json"),
+        type_=JSON,
+    )
+
+
+class ReportService:
+    @staticmethod
+    async def get_pickup_report(
+        db: AsyncSession,
+        start_date: date,
+        end_date: date,
+        include_details: bool = True,
+        page: Optional[int] = None,
+        page_size: Optional[int] = None,
+    ) -> Optional[dict]:
+        """
+        Отчёт по выданным товарам за период одним запросом (CTE).
+
+        Итоги и детализация по клиентам берутся из дневных агрегатов
+        (daily_rollups) для закрытых дней и из сырых таблиц для остальных,
+        поэтому длинные периоды считаются за O(дней). Детализация по товарам
+        всегда строится по сырым таблицам; если переданы page и page_size,
+        она возвращается постранично.
+        Возвращает None, если статус PIKED не найден.
+        """
+        piked_status = (
+            select(Status.id).where(Status.name == BaseStatus.PIKED).limit(1).cte("piked_status")
+        )
+
+        # Дневные агрегаты: закрытые дни из daily_rollups, остальные — из сырых таблиц
+        daily = RollupService.combined_select(start_date, end_date).cte("daily")
+        picked_daily = select(daily).where(daily.c.products_count > 0).cte("picked_daily")
+
+        columns = [
+            select(piked_status.c.id).scalar_subquery().label("status_id"),
+            select(func.count(func.distinct(picked_daily.c.client_id)))
+            .where(picked_daily.c.client_id != NO_KEY)
+            .scalar_subquery().label("total_clients"),
+            select(func.coalesce(func.sum(picked_daily.c.products_count), 0)).scalar_subquery().label("total_products"),
+            select(func.coalesce(func.round(func.sum(picked_daily.c.total_weight), 2), 0)).scalar_subquery().label("total_weight"),
+            select(func.coalesce(func.sum(picked_daily.c.total_price), 0)).scalar_subquery().label("total_price"),
+        ]
+
+        if include_details:
+            picked = (
+                select(
+                    Product.id,
+                    Product.product_code,
+                    Product.client_id,
+                    Product.weight,
+                    Product.price,
+                    Product.take_time,
+                )
+                .where(
+                    Product.date.between(start_date, end_date),
+                    Product.status_id == select(piked_status.c.id).scalar_subquery(),
+                )
+                .cte("picked")
+            )
+            # Одна строка на товар, даже если он оплачен несколькими платежами
+            product_payment = RollupService.payment_method_lateral(picked.c.id)
+            rows = (
+                select(
+                    picked.c.id,
+                    picked.c.product_code,
+                    picked.c.weight,
+                    picked.c.price,
+                    picked.c.take_time,
+                    Client.name.label("client__name"),
+                    Client.code.label("client__code"),
+                    PaymentMethod.name.label("payments__payment_method__name"),
+                )
+                .select_from(picked)
+                .join(Client, Client.id == picked.c.client_id, isouter=True)
+                .join(product_payment, true(), isouter=True)
+                .join(PaymentMethod, product_payment.c.payment_method_id == PaymentMethod.id, isouter=True)
+                .cte("picked_rows")
+            )
+
+            # Детальная информация по клиентам
+            client_rows = (
+                select(
+                    Client.name.label("client__name"),
+                    Client.code.label("client__code"),
+                    PaymentMethod.name.label("payments__payment_method__name"),
+                    func.sum(picked_daily.c.products_count).label("total_products"),
+                    func.sum(picked_daily.c.total_weight).label("total_weight"),
+                    func.sum(picked_daily.c.total_price).label("total_price"),
+                    func.min(picked_daily.c.min_take_time).label("earliest_take_time"),
+                    func.max(picked_daily.c.max_take_time).label("latest_take_time"),
+                )
+                .select_from(picked_daily)
+                .join(Client, Client.id == picked_daily.c.client_id, isouter=True)
+                .join(PaymentMethod, PaymentMethod.id == picked_daily.c.payment_method_id, isouter=True)
+                .group_by(Client.name, Client.code, PaymentMethod.name)
+                .subquery("client_rows")
+            )
+            client_details = select(
+                _json_list(
+                    func.json_build_object(
+                        "client__name", client_rows.c.client__name,
+                        "client__code", client_rows.c.client__code,
+                        "total_products", client_rows.c.total_products,
+                        "total_weight", client_rows.c.total_weight,
+                        "total_price", client_rows.c.total_price,
+                        "payments__payment_method__name", client_rows.c.payments__payment_method__name,
+                        "earliest_take_time", client_rows.c.earliest_take_time,
+                        "latest_take_time", client_rows.c.latest_take_time,
+                    ),
+                    client_rows.c.client__name,
+                )
+            ).scalar_subquery()
+
+            # Подробности по каждому товару (при необходимости — одна страница)
+            product_rows = select(rows).order_by(rows.c.client__name, rows.c.take_time, rows.c.id)
+            if page and page_size:
+                product_rows = product_rows.offset((page - 1) * page_size).limit(page_size)
+            product_rows = product_rows.subquery("product_rows")
+            product_details = select(
+                _json_list(
+                    func.json_build_object(
+                        "product_code", product_rows.c.product_code,
+                        "client__name", product_rows.c.client__name,
+                        "client__code", product_rows.c.client__code,
+                        "weight", func.coalesce(product_rows.c.weight, 0),
+                        "price", func.coalesce(product_rows.c.price, 0),
+                        "take_time", product_rows.c.take_time,
+                        "payments__payment_method__name", product_rows.c.payments__payment_method__name,
+                    ),
+                    product_rows.c.client__name,
+                    product_rows.c.take_time,
+                    product_rows.c.id,
+                )
+            ).scalar_subquery()
+
+            columns += [
+                client_details.label("client_details"),
+                product_details.label("product_details"),
+                select(func.count()).select_from(rows).scalar_subquery().label("product_details_total"),
+            ]
+
+        row = (await db.execute(select(*columns))).one()
+        if row.status_id is None:
+            return None
+
+        report = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "total_clients": row.total_clients,
+            "total_products": int(row.total_products),
+            "total_weight": float(row.total_weight),
+            "total_price": int(row.total_price),
+        }
+        if include_details:
+            report["client_details"] = row.client_details
+            report["product_details"] = row.product_details
+            report["product_details_total"] = row.product_details_total
+            if page and page_size:
+                report["page"] = page
+                report["page_size"] = page_size
+                report["total_pages"] = (row.product_details_total + page_size - 1) // page_size
+        return report
+
+
+    @staticmethod
+    async def get_daily_report(
+        db: AsyncSession,
+        start_date: date,
+        end_date: date,
+        user_branches: List[int],
+    ) -> list:
+        """
+        Выдачи и оплаты по дням × филиал × способ оплаты за период
+        (пустой user_branches — все филиалы).
+        """
+        daily = RollupService.combined_select(start_date, end_date).subquery("daily")
+        query = (
+            select(
+                daily.c.day,
+                daily.c.branch_id,
+                daily.c.payment_method_id,
+                func.sum(daily.c.products_count).label("products_count"),
+                func.sum(daily.c.total_weight).label("total_weight"),
+                func.sum(daily.c.total_price).label("total_price"),
+                func.sum(daily.c.payments_count).label("payments_count"),
+                func.sum(daily.c.payments_amount).label("payments_amount"),
+            )
+            .group_by(daily.c.day, daily.c.branch_id, daily.c.payment_method_id)
+            .order_by(daily.c.day, daily.c.branch_id, daily.c.payment_method_id)
+        )
+        if user_branches:
+            query = query.where(daily.c.branch_id.in_(user_branches))
+
+        result = await db.execute(query)
+        return [
+            {
+                "day": row.day.isoformat(),
+                "branch_id": row.branch_id or None,
+                "payment_method_id": row.payment_method_id or None,
+                "products_count": int(row.products_count),
+                "total_weight": float(row.total_weight),
+                "total_price": int(row.total_price),
+                "payments_count": int(row.payments_count),
+                "payments_amount": float(row.payments_amount),
+            }
+            for row in result.all()
+        ]
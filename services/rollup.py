@@ -0,0 +1,218 @@
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Optional, Tuple
+from sqlalchemy import Date, DateTime, and_, cast, delete, func, insert, literal, null, or_, select, true, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.statuses import BaseStatus
+from models import Product, Status, Payment, payment_products
+from models.counter import NO_KEY
+from models.rollup import DailyRollup, Watermark
+
+# Границы диапазона дней, за которые построены агрегаты
+ROLLUP_FROM = "daily_rollup:from"
+ROLLUP_TO = "daily_rollup:to"
+ROLLUP_LOCK = "daily_rollup:rebuild"
+
+# Сколько последних закрытых дней пересчитывается при каждом запуске
+# (на случай правок и удалений задним числом). Более старые правки, удаления и смены
+# статуса попадают в агрегаты только при ночной полной пересборке (rebuild_covered)
+ROLLUP_LOOKBACK_DAYS = 3
+# Размер порции полной пересборки: каждая порция — отдельная транзакция
+ROLLUP_CHUNK_DAYS = 31
+
+ROLLUP_COLUMNS = [
+    "day",
+    "branch_id",
+    "payment_method_id",
+    "client_id",
+    "products_count",
+    "total_weight",
+    "total_price",
+    "min_take_time",
+    "max_take_time",
+    "payments_count",
+    "payments_amount",
+]
+
+
+class RollupService:
+    @staticmethod
+    def payment_method_lateral(product_id, name: str = "product_payment"):
+        """
+        Способ оплаты товара по его последнему платежу (LATERAL, не больше одной строки).
+
+        Товар может входить в несколько платежей: прямой join с payment_products
+        размножил бы его строки и завысил количество, вес и сумму.
+        """
+        return (
+            select(Payment.payment_method_id)
+            .join(payment_products, Payment.id == payment_products.c.payment_id)
+            .where(payment_products.c.product_id == product_id)
+            .order_by(Payment.paid_at.desc(), Payment.id.desc())
+            .limit(1)
+            .lateral(name)
+        )
+
+    @staticmethod
+    def daily_select(day_filter: Callable):
+        """
+        Агрегирует сырые таблицы в строки формата DailyRollup.
+
+        day_filter получает выражение дня (products.date или payments.paid_at::date)
+        и возвращает условие отбора.
+        """
+        piked_status_id = select(Status.id).where(Status.name == BaseStatus.PIKED).limit(1).scalar_subquery()
+
+        products_day = Product.date
+        product_payment = RollupService.payment_method_lateral(Product.id)
+        products_keys = [
+            func.coalesce(Product.branch_id, NO_KEY),
+            func.coalesce(product_payment.c.payment_method_id, NO_KEY),
+            func.coalesce(Product.client_id, NO_KEY),
+        ]
+        products_part = (
+            select(
+                products_day.label("day"),
+                *products_keys,
+                func.count(Product.id),
+                func.coalesce(func.sum(Product.weight), 0),
+                func.coalesce(func.sum(Product.price), 0),
+                func.min(Product.take_time),
+                func.max(Product.take_time),
+                literal(0),
+                literal(0),
+            )
+            .select_from(Product)
+            .join(product_payment, true(), isouter=True)
+            .where(Product.status_id == piked_status_id, day_filter(products_day))
+            .group_by(products_day, *products_keys)
+        )
+
+        payments_day = cast(Payment.paid_at, Date)
+        payments_keys = [
+            func.coalesce(Payment.branch_id, NO_KEY),
+            func.coalesce(Payment.payment_method_id, NO_KEY),
+            func.coalesce(Payment.client_id, NO_KEY),
+        ]
+        payments_part = (
+            select(
+                payments_day.label("day"),
+                *payments_keys,
+                literal(0),
+                literal(0),
+                literal(0),
+                cast(null(), DateTime),
+                cast(null(), DateTime),
+                func.count(Payment.id),
+                func.coalesce(func.sum(Payment.amount), 0),
+            )
+            .where(day_filter(payments_day))
+            .group_by(payments_day, *payments_keys)
+        )
+
+        raw = union_all(products_part, payments_part).subquery("raw_daily")
+        c = list(raw.c)
+        return (
+            select(
+                c[0].label("day"),
+                c[1].label("branch_id"),
+                c[2].label("payment_method_id"),
+                c[3].label("client_id"),
+                func.sum(c[4]).label("products_count"),
+                func.sum(c[5]).label("total_weight"),
+                func.sum(c[6]).label("total_price"),
+                func.min(c[7]).label("min_take_time"),
+                func.max(c[8]).label("max_take_time"),
+                func.sum(c[9]).label("payments_count"),
+                func.sum(c[10]).label("payments_amount"),
+            )
+            .group_by(c[0], c[1], c[2], c[3])
+        )
+
+    @staticmethod
+    def coverage_subqueries():
+        """Границы покрытия агрегатами как скалярные подзапросы (для использования внутри отчётов)."""
+        day_from = select(cast(Watermark.value, Date)).where(Watermark.name == ROLLUP_FROM).scalar_subquery()
+        day_to = select(cast(Watermark.value, Date)).where(Watermark.name == ROLLUP_TO).scalar_subquery()
+        return day_from, day_to
+
+    @staticmethod
+    def combined_select(start_date: date, end_date: date):
+        """
+        Строки DailyRollup за период: закрытые дни — из агрегатов,
+        остальные (сегодня и не построенные дни) — из сырых таблиц.
+        """
+        day_from, day_to = RollupService.coverage_subqueries()
+
+        rolled = select(*[getattr(DailyRollup, name) for name in ROLLUP_COLUMNS]).where(
+            DailyRollup.day.between(start_date, end_date),
+            DailyRollup.day.between(day_from, day_to),
+        )
+        raw = RollupService.daily_select(
+            lambda day: and_(
+                day.between(start_date, end_date),
+                or_(day_to.is_(None), day < day_from, day > day_to),
+            )
+        )
+        return union_all(rolled, raw)
+
+    @staticmethod
+    async def get_coverage(db: AsyncSession) -> Tuple[Optional[date], Optional[date]]:
+        result = await db.execute(
+            select(Watermark.name, Watermark.value).where(Watermark.name.in_([ROLLUP_FROM, ROLLUP_TO]))
+        )
+        values = {name: value.date() if value else None for name, value in result.all()}
+        return values.get(ROLLUP_FROM), values.get(ROLLUP_TO)
+
+    @staticmethod
+    async def _set_coverage(db: AsyncSession, day_from: date, day_to: date) -> None:
+        stmt = pg_insert(Watermark).values([
+            {"name": ROLLUP_FROM, "value": datetime.combine(day_from, time.min)},
+            {"name": ROLLUP_TO, "value": datetime.combine(day_to, time.min)},
+        ])
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[Watermark.name],
+                set_={"value": stmt.excluded.value, "updated_at": func.now()},
+            )
+        )
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, day_from: date, day_to: date) -> int:
+        """Пересобирает агрегаты за [day_from, day_to] и расширяет покрытие. Коммит — на вызывающей стороне."""
+        # Почасовое обновление и ночная пересборка могут пересекаться по дням:
+        # пересборки выполняются по очереди, иначе вставки столкнутся по первичному ключу
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(ROLLUP_LOCK))))
+        await db.execute(delete(DailyRollup).where(DailyRollup.day.between(day_from, day_to)))
+        result = await db.execute(
+            insert(DailyRollup).from_select(
+                ROLLUP_COLUMNS,
+                RollupService.daily_select(lambda day: day.between(day_from, day_to)),
+            )
+        )
+
+        covered_from, covered_to = await RollupService.get_coverage(db)
+        if covered_to is None or day_from > covered_to + timedelta(days=1) or day_to < covered_from - timedelta(days=1):
+            # Нет покрытия или новый диапазон не примыкает к нему — покрытие начинается заново,
+            # иначе отчёты посчитали бы дни в разрыве как пустые
+            covered_from, covered_to = day_from, day_to
+        else:
+            covered_from, covered_to = min(covered_from, day_from), max(covered_to, day_to)
+        await RollupService._set_coverage(db, covered_from, covered_to)
+
+        return result.rowcount
+
+    @staticmethod
+    async def refresh(db: AsyncSession, today: date) -> dict:
+        """Достраивает агрегаты до вчерашнего дня включительно, пересчитывая последние дни."""
+        yesterday = today - timedelta(days=1)
+        _, covered_to = await RollupService.get_coverage(db)
+        if covered_to is None:
+            day_from = yesterday - timedelta(days=ROLLUP_LOOKBACK_DAYS - 1)
+        else:
+            day_from = min(covered_to + timedelta(days=1), yesterday) - timedelta(days=ROLLUP_LOOKBACK_DAYS - 1)
+
+        rows = await RollupService.rebuild(db, day_from, yesterday)
+        await db.commit()
+        return {"day_from": day_from.isoformat(), "day_to": yesterday.isoformat(), "rows": rows}
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Optional
+import aiofiles
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+from aiobotocore.config import AioConfig
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from config.config import S3_PART_SIZE, S3_UPLOAD_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Минимальный размер части multipart в S3 (кроме последней)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+async def _read_exactly(read: Callable[[int], Awaitable[bytes]], size: int) -> bytes:
+    """Читает size байт (меньше — только в конце потока): UploadFile может отдавать порции меньше запрошенных."""
+    chunks, received = [], 0
+    while received < size:
+        chunk = await read(size - received)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        received += len(chunk)
+    return b"".join(chunks)
+
+
+class S3Client:
+    def __init__(self, access_key, secret_key, endpoint_url, bucket_name):
+        self.config = {
+            "aws_access_key_id": access_key,
+            "aws_secret_access_key": secret_key,
+            "endpoint_url": endpoint_url,
+            "use_ssl": False,
+        }
+        self.bucket_name = bucket_name
+        self.endpoint_url = endpoint_url
+        self.session = get_session()
+        self.aio_config = AioConfig(max_pool_connections=50)  # Увеличение одновременных подключений
+        self._client = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Создаёт клиент один раз на процесс: соединения к S3 переиспользуются между запросами."""
+        async with self._lock:
+            if self._client is None:
+                self._exit_stack = AsyncExitStack()
+                self._client = await self._exit_stack.enter_async_context(
+                    self.session.create_client(
+                        "s3",
+                        region_name="ru-1",
+                        config=self.aio_config,
+                        **self.config
+                    )
+                )
+        return self._client
+
+    async def close(self):
+        async with self._lock:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+            self._client = None
+            self._exit_stack = None
+
+    @asynccontextmanager
+    async def get_client(self):
+        yield self._client or await self.start()
+
+    def object_url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket_name}/{key}"
+
+    async def _multipart_upload(
+        self,
+        client,
+        read: Callable[[int], Awaitable[bytes]],
+        key: str,
+        first_part: bytes,
+        part_size: int,
+        concurrency: int,
+        content_type: Optional[str] = None,
+    ):
+        """
+        Загружает поток частями по part_size, не больше concurrency частей одновременно.
+        В памяти одновременно находится не больше concurrency частей. При ошибке
+        загрузка отменяется (abort_multipart_upload), чтобы части не оставались в бакете.
+        """
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if content_type:
+            params["ContentType"] = content_type
+        mpu = await client.create_multipart_upload(**params)
+        upload_id = mpu["UploadId"]
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = []
+
+        async def upload_part(part_number: int, data: bytes):
+            try:
+                response = await client.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    PartNumber=part_number,
+                    UploadId=upload_id,
+                    Body=data
+                )
+                return {"ETag": response["ETag"], "PartNumber": part_number}
+            finally:
+                semaphore.release()
+
+        try:
+            data, part_number = first_part, 1
+            while data:
+                await semaphore.acquire()
+                # Ошибка уже загруженной части прерывает чтение остального потока
+                failed = next((task for task in tasks if task.done() and task.exception()), None)
+                if failed is not None:
+                    raise failed.exception()
+                tasks.append(asyncio.create_task(upload_part(part_number, data)))
+                part_number += 1
+                data = await _read_exactly(read, part_size)
+
+            parts = await asyncio.gather(*tasks)
+            await client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            except ClientError as e:
+                logger.error(f"Не удалось отменить загрузку {key}: {e}")
+            raise
+
+    async def upload_stream(
+        self,
+        read: Callable[[int], Awaitable[bytes]],
+        key: str,
+        part_size: int = S3_PART_SIZE,
+        concurrency: int = S3_UPLOAD_CONCURRENCY,
+        content_type: Optional[str] = None,
+    ) -> str:
+        """
+        Загружает данные из асинхронного read(n) под ключом key и возвращает URL объекта.
+        Маленькие файлы уходят одним put_object, большие — multipart без временного файла.
+        content_type, если передан, сохраняется как Content-Type объекта.
+        """
+        part_size = max(part_size, MIN_PART_SIZE)
+        client = await self.start()
+        first_part = await _read_exactly(read, part_size)
+        if len(first_part) < part_size:
+            params = {"Bucket": self.bucket_name, "Key": key, "Body": first_part}
+            if content_type:
+                params["ContentType"] = content_type
+            await client.put_object(**params)
+        else:
+            await self._multipart_upload(client, read, key, first_part, part_size, concurrency, content_type)
+        return self.object_url(key)
+
+    async def upload_fileobj(self, file, filename: str, folder: str = None) -> Optional[str]:
+        """Загружает UploadFile (или любой объект с async read) напрямую в S3."""
+        object_name = os.path.basename(filename)
+        if folder:
+            folder = folder.strip("/")
+            object_name = f"{folder}/{object_name}"
+        try:
+            return await self.upload_stream(file.read, object_name, content_type=getattr(file, "content_type", None))
+        except ClientError as e:
+            logger.error(f"Error uploading file: {e}")
+            return None
+
+    async def upload_file(self, file_path: str, folder: str = None):
+        async with aiofiles.open(file_path, "rb") as file:
+            url = await self.upload_fileobj(file, file_path, folder=folder)
+        if url:
+            os.remove(file_path)
+        return url
+
+    async def presign_put(self, key: str, content_type: Optional[str] = None, expires_in: int = 3600) -> str:
+        """URL для загрузки объекта напрямую в бакет (PUT)."""
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if content_type:
+            params["ContentType"] = content_type
+        client = await self.start()
+        return await client.generate_presigned_url("put_object", Params=params, ExpiresIn=expires_in)
+
+    async def presign_get(self, key: str, expires_in: int = 3600, filename: Optional[str] = None) -> str:
+        """Временная ссылка на скачивание объекта."""
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        client = await self.start()
+        return await client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_in)
+
+    async def create_presigned_multipart(self, key: str, parts_count: int, content_type: Optional[str] = None,
+                                         expires_in: int = 3600) -> dict:
+        """Начинает multipart-загрузку и выдаёт URL для каждой части (PUT)."""
+        client = await self.start()
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if content_type:
+            params["ContentType"] = content_type
+        mpu = await client.create_multipart_upload(**params)
+        upload_id = mpu["UploadId"]
+        urls = [
+            {
+                "part_number": part_number,
+                "url": await client.generate_presigned_url(
+                    "upload_part",
+                    Params={"Bucket": self.bucket_name, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+                    ExpiresIn=expires_in,
+                ),
+            }
+            for part_number in range(1, parts_count + 1)
+        ]
+        return {"upload_id": upload_id, "parts": urls}
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: list) -> str:
+        client = await self.start()
+        await client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda part: part["PartNumber"])},
+        )
+        return self.object_url(key)
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        client = await self.start()
+        await client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
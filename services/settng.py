@@ -3,6 +3,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from models import Configuration
 from schemas.setting import ConfigurationBase
+from config.cache import CacheTag, invalidate
 
 class SettingService:
     @staticmethod
@@ -10,6 +11,7 @@ class SettingService:
         db_setting = Configuration(**setting_data.dict())
         db.add(db_setting)
         await db.commit()
+        await invalidate(CacheTag.SETTINGS)
         await db.refresh(db_setting)
         return db_setting
     
@@ -35,6 +37,7 @@ class SettingService:
             setattr(setting, key, value)
         
         await db.commit()
+        await invalidate(CacheTag.SETTINGS)
         await db.refresh(setting)
         return setting
     
\ No newline at end of file
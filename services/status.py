@@ -1,16 +1,53 @@
 # services/status_service.py
+import logging
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from models.status import Status
 from schemas.status import StatusCreate, StatusUpdate
-from typing import Optional, List
+from typing import Dict, Optional, List
+from config.cache import CacheTag, invalidate
+from config.statuses import BaseStatus, BISHKEK_STATUS_ID
+
+logger = logging.getLogger(__name__)
+
+# Другие воркеры узнают об изменении справочника статусов не позже чем через STATUS_IDS_TTL секунд
+STATUS_IDS_TTL = 60
+
 
 class StatusService:
+    _ids: Dict[str, int] = {}
+    _loaded_at: float = 0.0
+
+    @staticmethod
+    async def load_ids(db: AsyncSession) -> Dict[str, int]:
+        """Загружает id статусов по именам и проверяет id, под который построен частичный индекс."""
+        result = await db.execute(select(Status.name, Status.id))
+        StatusService._ids = dict(result.all())
+        StatusService._loaded_at = time.monotonic()
+
+        bishkek_id = StatusService._ids.get(BaseStatus.BISHKEK)
+        if bishkek_id is not None and bishkek_id != BISHKEK_STATUS_ID:
+            logger.warning(
+                f"Статус '{BaseStatus.BISHKEK}' имеет id {bishkek_id}, а частичный индекс "
+                f"ix_products_client_bishkek построен для {BISHKEK_STATUS_ID}: выдача будет работать без него"
+            )
+        return StatusService._ids
+
+    @staticmethod
+    async def get_id(db: AsyncSession, name: str) -> Optional[int]:
+        """id статуса по имени (BaseStatus); None, если такого статуса нет."""
+        if time.monotonic() - StatusService._loaded_at > STATUS_IDS_TTL:
+            await StatusService.load_ids(db)
+        return StatusService._ids.get(name)
+
     @staticmethod
     async def create_status(db: AsyncSession, status_data: StatusCreate) -> Status:
         db_status = Status(**status_data.dict())
         db.add(db_status)
         await db.commit()
+        await invalidate(CacheTag.STATUSES, CacheTag.SUMMARY)
+        StatusService._loaded_at = 0.0
         await db.refresh(db_status)
         return db_status
 
@@ -39,6 +76,8 @@ class StatusService:
             setattr(db_status, key, value)
         
         await db.commit()
+        await invalidate(CacheTag.STATUSES, CacheTag.SUMMARY)
+        StatusService._loaded_at = 0.0
         await db.refresh(db_status)
         return db_status
 
@@ -50,4 +89,6 @@ class StatusService:
         
         await db.delete(db_status)
         await db.commit()
+        await invalidate(CacheTag.STATUSES, CacheTag.SUMMARY)
+        StatusService._loaded_at = 0.0
         return db_status
\ No newline at end of file
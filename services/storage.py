@@ -0,0 +1,225 @@
+import hashlib
+import hmac
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from urllib.parse import urlencode
+import aiofiles
+import aiofiles.os
+from botocore.exceptions import ClientError
+
+from config.config import (
+    SECRET,
+    ACCESS_KEY,
+    SECRET_KEY,
+    ENDPOINT_URL,
+    BUCKET_NAME,
+    STORAGE_BACKEND,
+    LOCAL_STORAGE_DIR,
+)
+from media import MEDIA_DIR
+from services.s3 import S3Client
+
+CHUNK_SIZE = 1024 * 1024
+
+Reader = Callable[[int], Awaitable[bytes]]
+
+
+def iterator_reader(chunks: AsyncIterator[bytes]) -> Reader:
+    """Превращает асинхронный поток порций (например, request.stream()) в read(n)."""
+    buffer = bytearray()
+    exhausted = False
+
+    async def read(size: int = -1) -> bytes:
+        nonlocal exhausted
+        while not exhausted and (size < 0 or len(buffer) < size):
+            try:
+                buffer.extend(await chunks.__anext__())
+            except StopAsyncIteration:
+                exhausted = True
+        if size < 0:
+            size = len(buffer)
+        data = bytes(buffer[:size])
+        del buffer[:size]
+        return data
+
+    return read
+
+
+class Storage(ABC):
+    """Хранилище объектов по ключу: S3 в проде, файловая система в разработке и тестах."""
+
+    @abstractmethod
+    async def put(self, key: str, read: Reader, content_type: Optional[str] = None) -> str:
+        """Сохраняет поток read(n) под ключом key и возвращает URL объекта."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        ...
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def presign(
+        self, key: str, method: str = "GET", expires_in: int = 3600, content_type: Optional[str] = None
+    ) -> str:
+        """Временная ссылка на скачивание (GET) или загрузку (PUT) объекта."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class S3Storage(Storage):
+    def __init__(self, client: S3Client):
+        self.client = client
+
+    async def put(self, key: str, read: Reader, content_type: Optional[str] = None) -> str:
+        return await self.client.upload_stream(read, key, content_type=content_type)
+
+    async def get(self, key: str) -> bytes:
+        client = await self.client.start()
+        response = await client.get_object(Bucket=self.client.bucket_name, Key=key)
+        async with response["Body"] as body:
+            return await body.read()
+
+    async def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        client = await self.client.start()
+        response = await client.get_object(Bucket=self.client.bucket_name, Key=key)
+        async with response["Body"] as body:
+            while chunk := await body.read(chunk_size):
+                yield chunk
+
+    async def exists(self, key: str) -> bool:
+        client = await self.client.start()
+        try:
+            await client.head_object(Bucket=self.client.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    async def delete(self, key: str) -> None:
+        client = await self.client.start()
+        await client.delete_object(Bucket=self.client.bucket_name, Key=key)
+
+    async def presign(
+        self, key: str, method: str = "GET", expires_in: int = 3600, content_type: Optional[str] = None
+    ) -> str:
+        if method == "PUT":
+            return await self.client.presign_put(key, content_type, expires_in=expires_in)
+        return await self.client.presign_get(key, expires_in=expires_in)
+
+    def url(self, key: str) -> str:
+        return self.client.object_url(key)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+class LocalStorage(Storage):
+    """
+    Хранилище в каталоге root. Подписанные ссылки проверяются verify()
+    (HMAC от метода, ключа и срока действия).
+    """
+
+    def __init__(self, root: str, base_url: str, secret: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        self.secret = (secret or "local-storage").encode()
+        # Временные файлы внутри root, чтобы перенос на место был атомарным os.replace
+        self.tmp_dir = os.path.join(self.root, ".tmp")
+
+    def path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep) or any(part.startswith(".") for part in key.split("/")):
+            raise ValueError("Недопустимый ключ объекта")
+        return path
+
+    async def put(self, key: str, read: Reader, content_type: Optional[str] = None) -> str:
+        path = self.path(key)
+        await aiofiles.os.makedirs(self.tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        try:
+            async with aiofiles.open(tmp_path, "wb") as buffer:
+                while chunk := await read(CHUNK_SIZE):
+                    await buffer.write(chunk)
+            await aiofiles.os.makedirs(os.path.dirname(path), exist_ok=True)
+            await aiofiles.os.replace(tmp_path, path)
+        finally:
+            if await aiofiles.os.path.exists(tmp_path):
+                await aiofiles.os.remove(tmp_path)
+        return self.url(key)
+
+    async def get(self, key: str) -> bytes:
+        async with aiofiles.open(self.path(key), "rb") as file:
+            return await file.read()
+
+    async def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.path(key), "rb") as file:
+            while chunk := await file.read(chunk_size):
+                yield chunk
+
+    async def exists(self, key: str) -> bool:
+        return await aiofiles.os.path.isfile(self.path(key))
+
+    async def delete(self, key: str) -> None:
+        try:
+            await aiofiles.os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def _signature(self, key: str, method: str, expires: int) -> str:
+        return hmac.new(self.secret, f"{method}\n{key}\n{expires}".encode(), hashlib.sha256).hexdigest()
+
+    def sign(self, key: str, method: str = "GET", expires_in: int = 3600) -> dict:
+        """Параметры подписанной ссылки (method, expires, signature) для проверки через verify()."""
+        expires = int(time.time()) + expires_in
+        return {"method": method, "expires": expires, "signature": self._signature(key, method, expires)}
+
+    async def presign(
+        self, key: str, method: str = "GET", expires_in: int = 3600, content_type: Optional[str] = None
+    ) -> str:
+        self.path(key)
+        return f"{self.url(key)}?{urlencode(self.sign(key, method, expires_in))}"
+
+    def verify(self, key: str, method: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(key, method, expires), signature)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+def build_document_storage() -> Storage:
+    if STORAGE_BACKEND == "s3":
+        return S3Storage(S3Client(
+            access_key=ACCESS_KEY,
+            secret_key=SECRET_KEY,
+            endpoint_url=ENDPOINT_URL,
+            bucket_name=BUCKET_NAME,
+        ))
+    # Локальные документы отдаются и принимаются по подписанным ссылкам через /storage/local
+    return LocalStorage(LOCAL_STORAGE_DIR, "/storage/local", secret=SECRET)
+
+
+# Документы (S3 или локальный каталог) и медиафайлы рассылок (MEDIA_DIR, раздаётся через /media)
+document_storage = build_document_storage()
+media_storage = LocalStorage(MEDIA_DIR, "/media", secret=SECRET)
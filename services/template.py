@@ -0,0 +1,154 @@
+import time
+from string import Formatter
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import ARRAY, String, any_, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Text, ChinaAddress, Client
+
+# Подстановки, доступные в текстах: {count}, {client_code}, {client_name}, {china_address}
+PLACEHOLDERS = ("count", "client_code", "client_name", "china_address")
+# Подстановки, которые различаются между получателями
+RECIPIENT_PLACEHOLDERS = ("count", "client_code", "client_name")
+
+# Другие воркеры узнают об изменении текста не позже чем через TEMPLATES_TTL секунд
+TEMPLATES_TTL = 60
+
+
+class _Context(dict):
+    def __missing__(self, key):
+        return ""
+
+
+class CompiledTemplate:
+    """
+    Текст, разобранный один раз в строку формата только с известными подстановками.
+
+    Неизвестные подстановки и текст с непарными скобками выводятся как есть.
+    """
+
+    __slots__ = ("source", "parts", "fields", "format")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.parts = []
+        self.fields = set()
+        try:
+            for literal, field, _, _ in Formatter().parse(source):
+                if literal:
+                    self.parts.append((True, literal))
+                if field is None:
+                    continue
+                if field in PLACEHOLDERS:
+                    self.parts.append((False, field))
+                    self.fields.add(field)
+                else:
+                    self.parts.append((True, "{" + field + "}"))
+        except ValueError:
+            self.parts = [(True, source)]
+            self.fields = set()
+        # Литералы экранируются, поэтому format_map подставляет только разобранные поля
+        self.format = "".join(
+            value.replace("{", "{{").replace("}", "}}") if is_literal else "{" + value + "}"
+            for is_literal, value in self.parts
+        )
+
+    @property
+    def is_personal(self) -> bool:
+        return bool(self.fields.intersection(RECIPIENT_PLACEHOLDERS))
+
+    def render(self, context: dict) -> str:
+        return self.format.format_map(_Context(context))
+
+    def render_many(self, shared: dict, rows: Iterable[dict]) -> List[str]:
+        """Рендер для многих получателей: общие подстановки (shared) дополняются полями строки."""
+        if not self.is_personal:
+            text = self.render(shared)
+            return [text for _ in rows]
+        # Один контекст на всю выборку: строки одного вызова имеют одинаковый набор полей
+        context = _Context(shared)
+        result = []
+        for row in rows:
+            context.update(row)
+            result.append(self.format.format_map(context))
+        return result
+
+
+class TemplateService:
+    _templates: Dict[str, CompiledTemplate] = {}
+    _shared: dict = {}
+    _loaded_at: float = 0.0
+
+    @staticmethod
+    def invalidate() -> None:
+        """Сбрасывает скомпилированные шаблоны текущего воркера (вызывается после изменения текстов)."""
+        TemplateService._loaded_at = 0.0
+
+    @staticmethod
+    async def _load(db: AsyncSession) -> None:
+        result = await db.execute(select(Text.key, Text.text))
+        TemplateService._templates = {key: CompiledTemplate(text or "") for key, text in result.all()}
+
+        result = await db.execute(select(ChinaAddress).where(ChinaAddress.id == 1))
+        address = result.scalars().first()
+        china_address = "\n".join(
+            part for part in (address.name1, address.name2, address.name3) if part
+        ) if address else ""
+        TemplateService._shared = {"china_address": china_address}
+
+        TemplateService._loaded_at = time.monotonic()
+
+    @staticmethod
+    async def _ensure_loaded(db: AsyncSession) -> None:
+        if time.monotonic() - TemplateService._loaded_at > TEMPLATES_TTL:
+            await TemplateService._load(db)
+
+    @staticmethod
+    async def get(db: AsyncSession, key: str) -> Optional[CompiledTemplate]:
+        await TemplateService._ensure_loaded(db)
+        return TemplateService._templates.get(key)
+
+    @staticmethod
+    async def shared_context(db: AsyncSession) -> dict:
+        """Подстановки, общие для всех получателей (адрес склада в Китае)."""
+        await TemplateService._ensure_loaded(db)
+        return TemplateService._shared
+
+    @staticmethod
+    async def render_many(db: AsyncSession, key: str, rows: List[dict]) -> Optional[List[str]]:
+        """Тексты по шаблону key для каждой строки; None, если такого текста нет."""
+        template = await TemplateService.get(db, key)
+        if template is None:
+            return None
+        return template.render_many(await TemplateService.shared_context(db), rows)
+
+    @staticmethod
+    async def attach_texts(db: AsyncSession, key: str, notifications: List[dict]) -> List[dict]:
+        """
+        Добавляет к уведомлениям вида {"telegram_chat_id", "count"} готовый текст "text"
+        по шаблону key. Без такого текста уведомления возвращаются как есть,
+        и формулировку выбирает сервис бота.
+        """
+        template = await TemplateService.get(db, key)
+        if template is None or not notifications:
+            return notifications
+
+        rows = notifications
+        if template.fields.intersection(("client_code", "client_name")):
+            chat_ids = bindparam(
+                "chat_ids",
+                value=list({str(item["telegram_chat_id"]) for item in notifications}),
+                type_=ARRAY(String),
+            )
+            result = await db.execute(
+                select(Client.telegram_chat_id, Client.code, Client.name)
+                .where(Client.telegram_chat_id == any_(chat_ids))
+            )
+            clients = {chat_id: (code, name) for chat_id, code, name in result.all()}
+            rows = []
+            for item in notifications:
+                code, name = clients.get(str(item["telegram_chat_id"]), ("", ""))
+                rows.append({**item, "client_code": code or "", "client_name": name or ""})
+
+        texts = template.render_many(await TemplateService.shared_context(db), rows)
+        return [{**item, "text": text} for item, text in zip(notifications, texts)]
@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import Text
 from schemas.text import TextBase, TextCreate, TextUpdate
+from config.cache import CacheTag, invalidate
+from services.template import TemplateService
 
 class TextServices:
 
@@ -46,6 +48,8 @@ class TextServices:
         text = Text(**data.dict())
         session.add(text)
         await session.commit()
+        await invalidate(CacheTag.TEXTES)
+        TemplateService.invalidate()
         await session.refresh(text)
         return text
 
@@ -66,6 +70,8 @@ class TextServices:
             setattr(text, key, value)
         
         await session.commit()
+        await invalidate(CacheTag.TEXTES)
+        TemplateService.invalidate()
         await session.refresh(text)
         return text
 
@@ -0,0 +1,172 @@
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import pytz
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.config import SYSTEM_USER_ID
+from config.statuses import BaseStatus
+from models import Product, Client, Status, Configuration, ProductHistory, User
+from services.counter import CounterDelta
+from services.outbox import OutboxKind, OutboxService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TransitionRule:
+    """
+    Правило автоматической смены статуса.
+
+    Товары в статусе from_status, у которых age_column не позже
+    (сейчас - threshold_key часов), переводятся в to_status, а поля
+    stamp_fields получают текущую дату по Бишкеку.
+    """
+    name: str
+    from_status: str
+    to_status: str
+    age_column: str
+    threshold_key: str
+    stamp_fields: Tuple[str, ...] = ()
+    notify_kind: Optional[str] = None
+
+
+TRANSITION_RULES: List[TransitionRule] = [
+    TransitionRule(
+        name="china_to_transit",
+        from_status=BaseStatus.CHINA,
+        to_status=BaseStatus.TRANSIT,
+        age_column="date",
+        threshold_key="transit_hours",
+        stamp_fields=("date", "date_transit"),
+        notify_kind=OutboxKind.TRANSIT,
+    ),
+]
+
+
+class TransitionEngine:
+    @staticmethod
+    async def _status_ids(db: AsyncSession) -> Dict[str, int]:
+        result = await db.execute(select(Status.name, Status.id))
+        return dict(result.all())
+
+    @staticmethod
+    async def _threshold_hours(db: AsyncSession, key: str) -> Optional[int]:
+        result = await db.execute(select(Configuration.value).where(Configuration.key == key))
+        value = result.scalar()
+        return int(value) if value is not None else None
+
+    @staticmethod
+    async def _system_user(db: AsyncSession) -> Optional[User]:
+        """Пользователь, от имени которого пишется история: SYSTEM_USER_ID или первый суперпользователь."""
+        query = select(User)
+        if SYSTEM_USER_ID:
+            query = query.where(User.id == SYSTEM_USER_ID)
+        else:
+            query = query.where(User.is_superuser == True, User.is_active == True).order_by(User.email)
+        result = await db.execute(query.limit(1))
+        return result.scalars().first()
+
+    @staticmethod
+    async def apply_rule(db: AsyncSession, rule: TransitionRule, status_ids: Dict[str, int], user: Optional[User]) -> dict:
+        """
+        Выполняет правило одним UPDATE ... RETURNING и по возвращённым строкам
+        пишет историю, обновляет счётчики и готовит данные для уведомлений.
+        Коммит — на вызывающей стороне.
+        """
+        from_id = status_ids.get(rule.from_status)
+        to_id = status_ids.get(rule.to_status)
+        if from_id is None or to_id is None:
+            raise ValueError(f"Статусы для правила {rule.name} не найдены")
+
+        hours = await TransitionEngine._threshold_hours(db, rule.threshold_key)
+        if hours is None:
+            raise ValueError(f"Настройка {rule.threshold_key} не найдена")
+
+        now = datetime.now(pytz.UTC)
+        cutoff = now - timedelta(hours=hours)
+        today = datetime.now(pytz.timezone('Asia/Bishkek')).date()
+
+        age_column = getattr(Product, rule.age_column)
+        if age_column.type.python_type is datetime:
+            cutoff_value = cutoff.replace(tzinfo=None)
+        else:
+            cutoff_value = cutoff.date()
+
+        moved = (
+            update(Product)
+            .where(Product.status_id == from_id, age_column <= cutoff_value)
+            .values(status_id=to_id, **{name: today for name in rule.stamp_fields})
+            .returning(Product.id, Product.product_code, Product.client_id, Product.branch_id, Product.price, Product.weight)
+            .cte("moved")
+        )
+        result = await db.execute(
+            select(moved, Client.telegram_chat_id)
+            .join(Client, Client.id == moved.c.client_id, isouter=True)
+        )
+        rows = result.all()
+
+        if rows and user is not None:
+            action_at = datetime.now(pytz.timezone('Asia/Bishkek')).replace(tzinfo=None)
+            await db.execute(
+                insert(ProductHistory),
+                [
+                    {
+                        "product_id": row.id,
+                        "action": "updated",
+                        "action_by_id": user.id,
+                        "action_at": action_at,
+                        "description": (
+                            f"Товар {row.product_code} updated пользователем {user.email} "
+                            f"со статусом {rule.to_status} status_id: {from_id} -> {to_id}"
+                        )[:255],
+                    }
+                    for row in rows
+                ],
+            )
+        elif rows:
+            logger.warning(f"Правило {rule.name}: нет системного пользователя, история не записана")
+
+        counters = CounterDelta()
+        for branch_id, count in Counter(row.branch_id for row in rows).items():
+            counters.move(from_id, branch_id, to_id, branch_id, count)
+        # Баланс клиентов меняется, только если правило уводит товары из BISHKEK или приводит в него
+        for row in rows:
+            counters.remove_balance(row.client_id, from_id, row.price, row.weight)
+            counters.add_balance(row.client_id, to_id, row.price, row.weight)
+        await counters.flush(db)
+
+        # Уведомления попадают в outbox в той же транзакции, что и смена статуса
+        notifications = Counter(row.telegram_chat_id for row in rows if row.telegram_chat_id)
+        if rule.notify_kind and notifications:
+            OutboxService.enqueue(db, rule.notify_kind, dict(notifications))
+
+        return {
+            "rule": rule.name,
+            "updated_count": len(rows),
+            "updated_ids": [row.id for row in rows],
+            "notifications": dict(notifications),
+        }
+
+    @staticmethod
+    async def run(db: AsyncSession, rules: List[TransitionRule] = TRANSITION_RULES) -> List[dict]:
+        """Выполняет все правила; каждое правило — отдельная транзакция."""
+        status_ids = await TransitionEngine._status_ids(db)
+        user = await TransitionEngine._system_user(db)
+
+        results = []
+        for rule in rules:
+            try:
+                result = await TransitionEngine.apply_rule(db, rule, status_ids, user)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Ошибка при выполнении правила {rule.name}: {e}")
+                results.append({"rule": rule.name, "error": str(e)})
+                continue
+
+            results.append(result)
+        return results
@@ -2,17 +2,17 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from fastapi_users.password import PasswordHelper
 from models import User, Branch
 from schemas.user import UserCreate, UserUpdate
+from auth.user_cache import UserCache
+from auth.token_version import TokenVersions
+from auth.password import hash_password
 from uuid import UUID
 
 class UserService:
-    password_helper = PasswordHelper()
-
     @staticmethod
     async def create_user(db: AsyncSession, user_data: UserCreate):
-        hashed_password = UserService.password_helper.hash(user_data.password)
+        hashed_password = await hash_password(user_data.password)
         db_user = User(
             email=user_data.email,
             hashed_password=hashed_password,
@@ -59,7 +59,7 @@ class UserService:
         update_data = user_data.dict(exclude_unset=True)
         for key, value in update_data.items():
             if key == "password" and value:
-                value = UserService.password_helper.hash(value)
+                db_user.hashed_password = await hash_password(value)
             elif key == "branch_ids" and value is not None:
                 branches = await db.execute(
                     select(Branch).where(Branch.id.in_(value))
@@ -67,8 +67,13 @@ class UserService:
                 db_user.branches = branches.scalars().all()
             else:
                 setattr(db_user, key, value)
+        # Токены с claims, выданные до изменения, больше не принимаются
+        if update_data:
+            db_user.token_version = (db_user.token_version or 0) + 1
         
         await db.commit()
+        UserCache.invalidate(user_id)
+        TokenVersions.invalidate()
         await db.refresh(db_user)
         return db_user
 
@@ -80,4 +85,6 @@ class UserService:
         
         await db.delete(db_user)
         await db.commit()
+        UserCache.invalidate(user_id)
+        TokenVersions.invalidate()
         return db_user
\ No newline at end of file
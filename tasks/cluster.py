@@ -0,0 +1,106 @@
+import hashlib
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy import func, select
+
+from config.database import engine, async_session_maker
+from models.job_run import JobRun
+from services.job_run import JobRunService
+
+logger = logging.getLogger(__name__)
+
+WORKER_NAME = f"{socket.gethostname()}:{os.getpid()}"
+
+# Ключи результата задачи, из которых берётся количество изменённых строк
+# (итоги вроде total_products — не изменения и сюда не попадают)
+_ROWS_KEYS = ("updated_count", "rows", "corrected_rows")
+
+
+def advisory_lock_key(name: str) -> int:
+    """Стабильный 64-битный ключ pg_advisory_lock для имени задачи."""
+    return int.from_bytes(hashlib.sha1(name.encode()).digest()[:8], "big", signed=True)
+
+
+def _rows_affected(result: Any) -> Optional[int]:
+    if not isinstance(result, dict):
+        return None
+    for key in _ROWS_KEYS:
+        if isinstance(result.get(key), int):
+            return result[key]
+    return None
+
+
+async def _record_run(name: str, started_at: datetime, duration_ms: int, result: Any, error: Optional[str]) -> None:
+    if error is None and isinstance(result, dict) and result.get("error"):
+        error = str(result["error"])
+    try:
+        async with async_session_maker() as db:
+            db.add(JobRun(
+                job_name=name,
+                status="error" if error else "success",
+                worker=WORKER_NAME,
+                started_at=started_at,
+                finished_at=datetime.utcnow(),
+                duration_ms=duration_ms,
+                rows_affected=_rows_affected(result),
+                error=error,
+            ))
+            await db.commit()
+    except Exception as e:
+        logger.error(f"Не удалось записать запуск задачи {name}: {e}")
+
+
+def cluster_job(
+    name: str,
+    job: Callable[[], Awaitable[Any]],
+    min_interval: Optional[timedelta] = None,
+) -> Callable[[], Awaitable[Any]]:
+    """
+    Оборачивает задачу планировщика так, чтобы в кластере её выполнял ровно один воркер.
+
+    Планировщик запускается в каждом воркере uvicorn; перед выполнением задача
+    берёт pg_try_advisory_lock по своему имени и пропускает запуск, если блокировка
+    занята. min_interval защищает от повторного запуска другим воркером, чей
+    триггер сработал чуть позже: если последний успешный запуск был недавно,
+    задача пропускается. Каждый запуск пишется в job_runs.
+    """
+    lock_key = advisory_lock_key(name)
+
+    @wraps(job)
+    async def wrapper():
+        async with engine.connect() as conn:
+            # Блокировка уровня сессии; AUTOCOMMIT — чтобы соединение не висело
+            # "idle in transaction" всё время задачи и не задерживало vacuum
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            locked = (await conn.execute(select(func.pg_try_advisory_lock(lock_key)))).scalar()
+            if not locked:
+                logger.info(f"Задача {name} уже выполняется другим воркером")
+                return None
+            try:
+                if min_interval is not None:
+                    async with async_session_maker() as db:
+                        last = await JobRunService.get_last_success(db, name)
+                    if last and last.started_at > datetime.utcnow() - min_interval:
+                        return None
+
+                started_at = datetime.utcnow()
+                started = time.monotonic()
+                result, error = None, None
+                try:
+                    result = await job()
+                except Exception as e:
+                    error = str(e)
+                    logger.error(f"Ошибка при выполнении задачи {name}: {e}")
+                duration_ms = int((time.monotonic() - started) * 1000)
+
+                await _record_run(name, started_at, duration_ms, result, error)
+                return result
+            finally:
+                await conn.execute(select(func.pg_advisory_unlock(lock_key)))
+
+    return wrapper
@@ -0,0 +1,26 @@
+import logging
+from datetime import datetime
+import pytz
+from config.database import async_session_maker
+from services.counter import CounterService
+from config.cache import CacheTag, invalidate
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_counters_async():
+    """
+    Периодически пересчитывает счётчики дашборда и балансы клиентов, исправляя возможный дрейф.
+    """
+    async with async_session_maker() as db:
+        try:
+            totals = await CounterService.reconcile(db)
+            await invalidate(CacheTag.SUMMARY)
+            return {
+                **totals,
+                "timestamp": datetime.now(pytz.UTC).isoformat(),
+            }
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Ошибка при пересчёте счётчиков: {e}")
+            return {"error": str(e)}
@@ -1,13 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
+from typing import Optional
 import httpx
-from .headers import headers
 from config.config import BISHKEK_API_URL
+from services.outbox import OutboxKind
+from services.template import TemplateService
+from .dispatch import send_chunked
 
 logger = logging.getLogger(__name__)
 
 
-async def notification_bishkek(db: AsyncSession, data: dict):
+async def notification_bishkek(db: AsyncSession, data: dict, client: Optional[httpx.AsyncClient] = None):
     notifications = []
 
     for user_code, count in data.items():  # Итерируем по ключам и значениям
@@ -20,11 +23,11 @@ async def notification_bishkek(db: AsyncSession, data: dict):
             logger.error(f"Ошибка при получении telegram_chat_id для user_code {user_code}: {e}")
 
     if notifications:
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(BISHKEK_API_URL, headers=headers, json=notifications)
-
-                if response.status_code != 200:
-                    logger.error(f"Не удалось отправить уведомления: {response.text}")
-            except Exception as e:
-                logger.error(f"Ошибка при отправке уведомлений: {e}")
\ No newline at end of file
+        # Если в /textes есть текст с ключом типа уведомления, каждому получателю уходит готовый текст
+        notifications = await TemplateService.attach_texts(db, OutboxKind.BISHKEK, notifications)
+        # Чтение закончено: соединение не остаётся в транзакции на время HTTP-запросов
+        await db.close()
+        # Порции по TELEGRAM_CHUNK_SIZE с повторами; при частичном сбое ChunkedSendError
+        # содержит неотправленных получателей, и outbox повторяет только их
+        return await send_chunked(BISHKEK_API_URL, notifications, client=client)
+    return []
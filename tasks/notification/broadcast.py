@@ -0,0 +1,103 @@
+import logging
+from collections import defaultdict
+from config.config import TELEGRAM_API_URL
+from config.database import async_session_maker
+from config.http_client import get_telegram_client, telegram_breaker
+from config.resilience import CircuitOpenError
+from services.notification import NotificationTaskService
+from services.template import CompiledTemplate, TemplateService
+from .dispatch import TransientSendError, post_checked
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_PAGE_SIZE = 500
+
+SEND_MESSAGE_URL = f"{TELEGRAM_API_URL}/api/v1/send_message"
+SEND_PHOTO_URL = f"{TELEGRAM_API_URL}/api/v1/send_photo"
+
+
+def _chat_id(value: str):
+    return int(value) if value.lstrip("-").isdigit() else value
+
+
+async def _send_page(message: str, images: list, chat_ids: list) -> None:
+    if images:
+        url, payload = SEND_PHOTO_URL, {"photos": images, "message": message, "parse_mode": "HTML"}
+    else:
+        url, payload = SEND_MESSAGE_URL, {"text": message, "parse_mode": "HTML"}
+    payload["chat_ids"] = chat_ids
+    await post_checked(get_telegram_client(), url, payload, len(chat_ids))
+
+
+async def dispatch_task(task_id: int, page_size: int = BROADCAST_PAGE_SIZE, max_pages: int = 50) -> dict:
+    """
+    Отправляет рассылку постранично. Каждая страница — отдельная транзакция:
+    статус получателей фиксируется сразу, поэтому после перезапуска рассылка
+    продолжается с неотправленных. На временной ошибке обработка прерывается
+    до следующего запуска планировщика.
+    """
+    sent, failed = 0, 0
+    for _ in range(max_pages):
+        async with async_session_maker() as db:
+            task = await NotificationTaskService.start(db, task_id)
+            if task is None:
+                break
+            template = CompiledTemplate(task.message)
+            shared = await TemplateService.shared_context(db)
+            images = await NotificationTaskService.get_images(db, task_id)
+            await db.commit()
+
+            page = await NotificationTaskService.claim_page(db, task_id, page_size)
+            if not page:
+                await NotificationTaskService.finish_if_done(db, task_id)
+                await db.commit()
+                break
+
+            # Текст рассылки — шаблон: получатели с одинаковым итоговым текстом уходят одним запросом
+            texts = template.render_many(
+                shared,
+                ({"client_code": row.code or "", "client_name": row.name or ""} for row in page),
+            )
+            groups = defaultdict(list)
+            for row, text in zip(page, texts):
+                groups[text].append(row)
+
+            deferred = False
+            for text, rows in groups.items():
+                chat_ids = [row.telegram_chat_id for row in rows]
+                try:
+                    await _send_page(text, images, [_chat_id(chat_id) for chat_id in chat_ids])
+                except (TransientSendError, CircuitOpenError) as e:
+                    await NotificationTaskService.defer_page(db, task_id, chat_ids, str(e))
+                    logger.warning(f"Рассылка {task_id}: временная ошибка, продолжение позже: {e}")
+                    deferred = True
+                    break
+                except Exception as e:
+                    await NotificationTaskService.mark_page(db, task_id, chat_ids, "failed", str(e))
+                    failed += len(chat_ids)
+                else:
+                    await NotificationTaskService.mark_page(db, task_id, chat_ids, "sent")
+                    sent += len(chat_ids)
+            await db.commit()
+            if deferred:
+                break
+
+    return {"task_id": task_id, "sent": sent, "failed": failed}
+
+
+async def dispatch_broadcasts_async() -> dict:
+    """Продолжает все незавершённые рассылки."""
+    if telegram_breaker.is_open:
+        return {"skipped": "circuit_open"}
+
+    async with async_session_maker() as db:
+        task_ids = await NotificationTaskService.get_active_ids(db)
+
+    results = []
+    for task_id in task_ids:
+        try:
+            results.append(await dispatch_task(task_id))
+        except Exception as e:
+            logger.error(f"Ошибка при отправке рассылки {task_id}: {e}")
+            results.append({"task_id": task_id, "error": str(e)})
+    return {"tasks": results}
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import random
+from typing import List, Optional
+import httpx
+
+from config.config import TELEGRAM_CHUNK_SIZE, TELEGRAM_CONCURRENCY, TELEGRAM_RETRIES
+from config.http_client import get_telegram_client
+
+logger = logging.getLogger(__name__)
+
+# Задержка перед повтором порции: 1с, 2с, 4с ... не больше 30с, со случайным разбросом
+RETRY_BASE_SECONDS = 1
+RETRY_MAX_SECONDS = 30
+
+
+class TransientSendError(Exception):
+    """Временная ошибка сервиса (сеть, таймаут, 429, 5xx) — порцию можно повторить."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ChunkedSendError(Exception):
+    """
+    Часть порций не отправлена. remaining — получатели из неотправленных порций,
+    results — итог по каждой порции.
+    """
+
+    def __init__(self, message: str, remaining: list, results: List[dict]):
+        super().__init__(message)
+        self.remaining = remaining
+        self.results = results
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def post_checked(client: httpx.AsyncClient, url: str, payload, recipients: int) -> httpx.Response:
+    """
+    POST в сервис Telegram с разбором ответа: временные ошибки (сеть, 429, 5xx)
+    выбрасываются как TransientSendError, прочие ответы кроме 200 — как RuntimeError.
+    """
+    try:
+        response = await client.post(url, json=payload, extensions={"recipients": recipients})
+    except httpx.TransportError as e:
+        raise TransientSendError(f"{type(e).__name__}: {e}")
+
+    if response.status_code == 429 or response.status_code >= 500:
+        raise TransientSendError(
+            f"{response.status_code} {response.text[:500]}", retry_after=_retry_after(response)
+        )
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.status_code} {response.text[:500]}")
+    return response
+
+
+async def _send_chunk(client: httpx.AsyncClient, url: str, index: int, chunk: list, retries: int) -> dict:
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            await post_checked(client, url, chunk, len(chunk))
+            return {"chunk": index, "recipients": len(chunk), "attempts": attempt, "ok": True}
+        except TransientSendError as e:
+            if attempt > retries:
+                return {"chunk": index, "recipients": len(chunk), "attempts": attempt, "ok": False, "error": str(e)}
+            delay = e.retry_after or min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+            delay *= random.uniform(0.5, 1.5)
+            logger.warning(f"Порция {index} ({url}): {e}, повтор через {delay:.1f}с")
+            await asyncio.sleep(delay)
+        except Exception as e:
+            return {"chunk": index, "recipients": len(chunk), "attempts": attempt, "ok": False, "error": str(e)}
+
+
+async def send_chunked(
+    url: str,
+    notifications: list,
+    client: Optional[httpx.AsyncClient] = None,
+    chunk_size: int = TELEGRAM_CHUNK_SIZE,
+    concurrency: int = TELEGRAM_CONCURRENCY,
+    retries: int = TELEGRAM_RETRIES,
+) -> List[dict]:
+    """
+    Отправляет получателей порциями по chunk_size, не больше concurrency порций одновременно.
+
+    Временные ошибки повторяются с экспоненциальной задержкой, остальные
+    (в том числе отказ разомкнутого предохранителя) сразу помечают порцию неуспешной. Возвращает итог по каждой порции;
+    если какие-то порции не отправлены, выбрасывает ChunkedSendError
+    со списком оставшихся получателей.
+    """
+    client = client or get_telegram_client()
+    chunks = [notifications[i:i + chunk_size] for i in range(0, len(notifications), chunk_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, chunk: list) -> dict:
+        async with semaphore:
+            return await _send_chunk(client, url, index, chunk, retries)
+
+    results = await asyncio.gather(*(run(index, chunk) for index, chunk in enumerate(chunks)))
+
+    failed = [result for result in results if not result["ok"]]
+    for result in failed:
+        logger.error(f"Порция {result['chunk']} ({url}) не отправлена: {result['error']}")
+    if failed:
+        remaining = [item for result in failed for item in chunks[result["chunk"]]]
+        raise ChunkedSendError(
+            f"Не отправлено {len(failed)} из {len(chunks)} порций ({len(remaining)} получателей): "
+            f"{failed[0]['error']}",
+            remaining=remaining,
+            results=results,
+        )
+
+    logger.info(f"{url}: отправлено {len(notifications)} получателей, порций: {len(chunks)}")
+    return results
@@ -1,7 +0,0 @@
-from config.config import TELEGRAM_API_KEY
-
-headers = {
-    "accept": "application/json",
-    "Content-Type": "application/json",
-    "X-API-Key": TELEGRAM_API_KEY
-}
\ No newline at end of file
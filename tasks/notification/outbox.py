@@ -0,0 +1,80 @@
+import logging
+from config.database import async_session_maker
+from config.http_client import telegram_breaker
+from services.outbox import OutboxKind, OutboxService
+from .china import notification_china
+from .bihskek import notification_bishkek
+from .transit_notifcation import notification_transit
+from .dispatch import ChunkedSendError
+
+logger = logging.getLogger(__name__)
+
+SENDERS = {
+    OutboxKind.CHINA: notification_china,
+    OutboxKind.TRANSIT: notification_transit,
+    OutboxKind.BISHKEK: notification_bishkek,
+}
+
+
+async def dispatch_outbox_async(batch_size: int = 100, max_batches: int = 20):
+    """
+    Отправляет накопившиеся уведомления из outbox пачками.
+
+    Пачка арендуется короткой транзакцией (статус 'sending'), отправка идёт
+    вне транзакции, а итог каждой записи фиксируется своей транзакцией:
+    успешные помечаются отправленными, неуспешные переносятся на более позднее
+    время с экспоненциальной задержкой. Итог по порциям сохраняется в chunk_results.
+    Если воркер упадёт посреди пачки, повторно отправятся только записи без итога.
+    """
+    # Пока предохранитель разомкнут, записи остаются в очереди и не тратят попытки
+    if telegram_breaker.is_open:
+        return {"sent": 0, "failed": 0, "skipped": "circuit_open"}
+
+    sent, failed = 0, 0
+    for _ in range(max_batches):
+        async with async_session_maker() as db:
+            claimed = await OutboxService.claim_batch(db, limit=batch_size)
+            if not claimed:
+                break
+            # Уведомления одного типа за окно объединяются в одно сообщение на клиента
+            messages = await OutboxService.coalesce(db, claimed)
+            await db.commit()
+
+        for index, message in enumerate(messages):
+            if telegram_breaker.is_open:
+                async with async_session_maker() as db:
+                    await OutboxService.release(db, messages[index:])
+                    await db.commit()
+                return {"sent": sent, "failed": failed, "skipped": "circuit_open"}
+
+            async with async_session_maker() as db:
+                sender = SENDERS.get(message.kind)
+                try:
+                    if sender is None:
+                        raise ValueError(f"Неизвестный тип уведомления: {message.kind}")
+                    results = await sender(db=db, data=message.payload)
+                    await OutboxService.mark_sent(db, message, chunk_results=results)
+                    sent += 1
+                except ChunkedSendError as e:
+                    # Отправленные порции не повторяются: в записи остаются только неотправленные получатели
+                    remaining = {item["telegram_chat_id"]: item["count"] for item in e.remaining}
+                    await OutboxService.mark_failed(db, message, str(e), payload=remaining, chunk_results=e.results)
+                    failed += 1
+                except Exception as e:
+                    await db.rollback()
+                    await OutboxService.mark_failed(db, message, str(e))
+                    failed += 1
+                await db.commit()
+
+        if len(claimed) < batch_size:
+            break
+
+    return {"sent": sent, "failed": failed}
+
+
+async def purge_outbox_async():
+    """Удаляет давно отправленные записи outbox."""
+    async with async_session_maker() as db:
+        rows = await OutboxService.purge_sent(db)
+        await db.commit()
+    return {"rows": rows}
@@ -1,4 +1,3 @@
-import asyncio
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -8,7 +7,8 @@ from io import BytesIO
 from datetime import datetime, timedelta, timezone
 from config.statuses import BaseStatus
 from services.product_history import ProductHistoryManager
-from tasks.notification.bihskek import notification_bishkek
+from services.counter import CounterDelta
+from services.outbox import OutboxKind, OutboxService
 
 async def process_bishkek_products(file_content: bytes, db: AsyncSession, user: dict):
     try:
@@ -18,6 +18,7 @@ async def process_bishkek_products(file_content: bytes, db: AsyncSession, user:
         products_created = 0
         products_updated = 0
         clients_products_count = {}
+        counters = CounterDelta()
 
         # Получаем статус "BISHKEK"
         bishkek_status_query = select(Status).filter(Status.name == BaseStatus.BISHKEK)
@@ -66,6 +67,9 @@ async def process_bishkek_products(file_content: bytes, db: AsyncSession, user:
                     "date_bishkek": product.date_bishkek
                 }
 
+                counters.move(old_data["status_id"], product.branch_id, bishkek_status.id, product.branch_id)
+                counters.remove_balance(old_data["client_id"], old_data["status_id"], old_data["price"], old_data["weight"])
+
                 # Обновляем существующий продукт
                 product.weight = weight
                 product.status_id = bishkek_status.id
@@ -77,6 +81,7 @@ async def process_bishkek_products(file_content: bytes, db: AsyncSession, user:
                 
                 # Устанавливаем даты через ProductHistoryManager
                 ProductHistoryManager.apply_status_dates(product, BaseStatus.BISHKEK)
+                counters.add_balance(product.client_id, product.status_id, product.price, product.weight)
                 
                 db.add(product)
                 await db.flush()  # Получаем ID для записи в историю
@@ -127,15 +132,21 @@ async def process_bishkek_products(file_content: bytes, db: AsyncSession, user:
                     user=user,
                     client_code=client_code
                 )
+                counters.add(product.status_id, product.branch_id)
+                counters.add_balance(product.client_id, product.status_id, product.price, product.weight)
                 products_created += 1
 
             if client:
                 clients_products_count[client.telegram_chat_id] = clients_products_count.get(client.telegram_chat_id, 0) + 1
 
-        await db.commit()
+        await counters.flush(db)
 
-        if clients_products_count:
-            asyncio.create_task(notification_bishkek(db=db, data=clients_products_count))
+        # Уведомление фиксируется в той же транзакции и отправляется диспетчером outbox
+        notifications = {chat_id: count for chat_id, count in clients_products_count.items() if chat_id}
+        if notifications:
+            OutboxService.enqueue(db, OutboxKind.BISHKEK, notifications)
+
+        await db.commit()
 
         return {
             "products_created": products_created,
@@ -1,4 +1,3 @@
-import asyncio
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -8,7 +7,8 @@ from io import BytesIO
 from datetime import datetime, timedelta, timezone
 from config.statuses import BaseStatus
 from services.product_history import ProductHistoryManager
-from tasks.notification.china import notification_china
+from services.counter import CounterDelta
+from services.outbox import OutboxKind, OutboxService
 
 # Асинхронная обработка файла
 async def process_china_products(file_content: bytes, db: AsyncSession, user: dict):
@@ -19,6 +19,7 @@ async def process_china_products(file_content: bytes, db: AsyncSession, user: di
         products_created = 0
         products_skipped = 0
         clients_products_count = {}
+        counters = CounterDelta()
 
         # Получаем статус "CHINA"
         china_status_query = select(Status).filter(Status.name == BaseStatus.CHINA)
@@ -85,15 +86,20 @@ async def process_china_products(file_content: bytes, db: AsyncSession, user: di
                 client_code=client_code
             )
 
+            counters.add(product.status_id, product.branch_id)
             products_created += 1
 
             if client:
                 clients_products_count[client.telegram_chat_id] = clients_products_count.get(client.telegram_chat_id, 0) + 1
 
-        await db.commit()
+        await counters.flush(db)
+
+        # Уведомление фиксируется в той же транзакции и отправляется диспетчером outbox
+        notifications = {chat_id: count for chat_id, count in clients_products_count.items() if chat_id}
+        if notifications:
+            OutboxService.enqueue(db, OutboxKind.CHINA, notifications)
 
-        if clients_products_count:
-            asyncio.create_task(notification_china(db=db, data=clients_products_count))
+        await db.commit()
 
         return {
             "products_created": products_created,
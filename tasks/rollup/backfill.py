@@ -0,0 +1,45 @@
+"""
+Построение дневных агрегатов за прошедший период.
+
+Запуск:
+    python -m tasks.rollup.backfill --start 2024-01-01 [--end 2024-12-31] [--chunk-days 31]
+
+По умолчанию --end — вчерашний день. Период обрабатывается порциями,
+каждая порция фиксируется отдельной транзакцией.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import pytz
+from config.database import async_session_maker
+from services.rollup import RollupService
+
+
+async def backfill(start, end, chunk_days: int = 31):
+    day_from = start
+    while day_from <= end:
+        day_to = min(day_from + timedelta(days=chunk_days - 1), end)
+        async with async_session_maker() as db:
+            rows = await RollupService.rebuild(db, day_from, day_to)
+            await db.commit()
+        print(f"{day_from.isoformat()} — {day_to.isoformat()}: {rows} строк")
+        day_from = day_to + timedelta(days=1)
+
+
+def main():
+    yesterday = datetime.now(pytz.timezone('Asia/Bishkek')).date() - timedelta(days=1)
+
+    parser = argparse.ArgumentParser(description="Построение дневных агрегатов за прошедший период")
+    parser.add_argument("--start", required=True, type=lambda v: datetime.strptime(v, "%Y-%m-%d").date())
+    parser.add_argument("--end", default=yesterday, type=lambda v: datetime.strptime(v, "%Y-%m-%d").date())
+    parser.add_argument("--chunk-days", default=31, type=int)
+    args = parser.parse_args()
+
+    if args.end > yesterday:
+        parser.error("--end не может быть позже вчерашнего дня: текущий день строится из сырых таблиц")
+
+    asyncio.run(backfill(args.start, args.end, args.chunk_days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import logging
+from datetime import datetime, timedelta
+import pytz
+from config.database import async_session_maker
+from services.rollup import RollupService, ROLLUP_CHUNK_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_daily_rollups_async():
+    """
+    Достраивает дневные агрегаты до вчерашнего дня (по времени Бишкека).
+    """
+    async with async_session_maker() as db:
+        try:
+            today = datetime.now(pytz.timezone('Asia/Bishkek')).date()
+            result = await RollupService.refresh(db, today)
+            return {
+                **result,
+                "timestamp": datetime.now(pytz.UTC).isoformat(),
+            }
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Ошибка при обновлении дневных агрегатов: {e}")
+            return {"error": str(e)}
+
+
+async def rebuild_covered_rollups_async():
+    """
+    Пересобирает все дни, покрытые агрегатами, порциями по ROLLUP_CHUNK_DAYS.
+
+    Почасовое обновление пересчитывает только последние ROLLUP_LOOKBACK_DAYS дней,
+    поэтому правки более старых товаров и оплат доходят до агрегатов здесь.
+    """
+    try:
+        async with async_session_maker() as db:
+            covered_from, covered_to = await RollupService.get_coverage(db)
+        if covered_to is None:
+            return {"rows": 0}
+
+        rows = 0
+        day_from = covered_from
+        while day_from <= covered_to:
+            day_to = min(day_from + timedelta(days=ROLLUP_CHUNK_DAYS - 1), covered_to)
+            async with async_session_maker() as db:
+                rows += await RollupService.rebuild(db, day_from, day_to)
+                await db.commit()
+            day_from = day_to + timedelta(days=1)
+
+        return {
+            "day_from": covered_from.isoformat(),
+            "day_to": covered_to.isoformat(),
+            "rows": rows,
+            "timestamp": datetime.now(pytz.UTC).isoformat(),
+        }
+    except Exception as e:
+        logger.error(f"Ошибка при пересборке дневных агрегатов: {e}")
+        return {"error": str(e)}